@@ -1,7 +1,16 @@
-import json
+from functools import lru_cache
+from operator import itemgetter
+
 import cv2
 import numpy as np
 
+from textract_utils import iter_blocks
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
 # === paths ===
 IMG_PATH = "./forms/original/IMG-20250924-WA0000.jpg"                  # original form image
 TEXTRACT_JSON = "./output/cloud_IMG-20250924-WA0000.json"
@@ -11,104 +20,216 @@ OUT_PATH = "./output/overlays/IMG-20250924-WA0000_overlay.jpg"
 image = cv2.imread(IMG_PATH)
 h, w = image.shape[:2]
 
-data = json.load(open(TEXTRACT_JSON))
-blocks = data["Blocks"]
+# Stream the Blocks array (ijson when installed, fastest whole-file
+# decoder otherwise): the overlay never reads any other part of the
+# Textract document, so the DOM wrapper is never materialized or retained
+blocks = list(iter_blocks(TEXTRACT_JSON))
+
+# Index blocks by Id once: child lookups in text_for become O(1)
+# hash probes instead of rescanning the whole Blocks list per child id.
+block_by_id = {b["Id"]: b for b in blocks}
 
 # === helper functions ===
 
 
-def get_text_from_block(block, blocks):
-    """Extract text from a block, handling relationships to child blocks"""
+@lru_cache(maxsize=None)
+def text_for(block_id):
+    """Extract text for a block by Id, handling relationships to child
+    blocks. Memoized: blocks that share child subtrees join them once."""
+    block = block_by_id[block_id]
     text = block.get("Text", "")
     if not text and "Relationships" in block:
         for rel in block["Relationships"]:
             if rel["Type"] == "CHILD":
                 words = []
                 for wid in rel["Ids"]:
-                    wblk = next(
-                        (x for x in blocks if x["Id"] ==
-                         wid and x["BlockType"] == "WORD"), None
-                    )
-                    if wblk:
+                    wblk = block_by_id.get(wid)
+                    if wblk and wblk["BlockType"] == "WORD":
                         words.append(wblk["Text"])
                 text = " ".join(words)
                 break
     return text.strip()
 
 
-def draw_rectangle_with_text(image, box, text, color, thickness=2, font_scale=0.4):
-    """Draw rectangle and text with given styling"""
-    top = int(box["Top"] * h)
-    left = int(box["Left"] * w)
-    width = int(box["Width"] * w)
-    height = int(box["Height"] * h)
-
-    p1 = (left, top)
-    p2 = (left + width, top + height)
-
-    cv2.rectangle(image, p1, p2, color, thickness)
-
-    if text:
-        cv2.putText(
-            image,
-            text[:30],  # truncate long text
-            (left + 2, top + 15),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            font_scale,
-            color,
-            thickness,
-            cv2.LINE_AA,
-        )
+# Label patches are rasterized once per unique (text, scale, color,
+# thickness) and blitted thereafter; repeated labels (the "H:"/"KEY:"
+# prefixless cells, R{i}-C{j} fallbacks, duplicate cell texts) skip the
+# Hershey rasterization in cv2.putText entirely.
+GLYPH_CACHE = {}
+
+
+def render_label(text, font_scale, color, thickness):
+    """Rasterize a label once; returns (premultiplied patch, alpha,
+    text_height). The glyph is drawn as a grayscale coverage mask so its
+    anti-aliased edges become an alpha channel instead of dark
+    color-on-black fringe pixels."""
+    key = (text, font_scale, color, thickness)
+    cached = GLYPH_CACHE.get(key)
+    if cached is None:
+        (tw, th), baseline = cv2.getTextSize(
+            text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+        mask = np.zeros((th + baseline, max(tw, 1)), dtype=np.uint8)
+        cv2.putText(mask, text, (0, th), cv2.FONT_HERSHEY_SIMPLEX,
+                    font_scale, 255, thickness, cv2.LINE_AA)
+        alpha = (mask.astype(np.float32) / 255.0)[..., None]
+        patch = alpha * np.asarray(color, dtype=np.float32)
+        cached = GLYPH_CACHE[key] = (patch, alpha, th)
+    return cached
+
+
+def blit_label(image, patch, alpha, x, y):
+    """Alpha-blend a label patch into the image at (x, y), matching the
+    blending cv2.putText would have done in place"""
+    ih, iw = image.shape[:2]
+    ph, pw = patch.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + pw, iw), min(y + ph, ih)
+    if x0 >= x1 or y0 >= y1:
+        return
+    region = image[y0:y1, x0:x1]
+    a = alpha[y0 - y:y1 - y, x0 - x:x1 - x]
+    p = patch[y0 - y:y1 - y, x0 - x:x1 - x]
+    # patch is premultiplied (color * alpha), so one multiply-add per pixel
+    np.copyto(region, (region * (1.0 - a) + p).astype(np.uint8))
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _stroke_rects(img, rects, b, g, r, thickness):
+        """Stroke (l, t, w, h) rectangle outlines straight into the image.
+
+        One parallel loop over rectangles writing four clipped bands per
+        box, centred on the edge like cv2.polylines; runs at memory
+        bandwidth with no per-call dispatch.
+        """
+        ih, iw = img.shape[0], img.shape[1]
+        half = thickness // 2
+        for i in prange(rects.shape[0]):
+            left = rects[i, 0] - half
+            top_ = rects[i, 1] - half
+            right = rects[i, 0] + rects[i, 2] + (thickness - half)
+            bottom = rects[i, 1] + rects[i, 3] + (thickness - half)
+            # Top and bottom bands
+            for y0 in (top_, bottom - thickness):
+                for y in range(max(y0, 0), min(y0 + thickness, ih)):
+                    for x in range(max(left, 0), min(right, iw)):
+                        img[y, x, 0] = b
+                        img[y, x, 1] = g
+                        img[y, x, 2] = r
+            # Left and right bands
+            for x0 in (left, right - thickness):
+                for x in range(max(x0, 0), min(x0 + thickness, iw)):
+                    for y in range(max(top_, 0), min(bottom, ih)):
+                        img[y, x, 0] = b
+                        img[y, x, 1] = g
+                        img[y, x, 2] = r
+else:
+    _stroke_rects = None
 
 
 # === draw overlays ===
-# First pass: Draw layout elements (background)
-for b in blocks:
-    if b["BlockType"] == "LAYOUT_TABLE":
-        text = get_text_from_block(b, blocks)
-        draw_rectangle_with_text(
-            image, b["Geometry"]["BoundingBox"], f"TABLE: {text}", (0, 255, 255), 3, 0.6)
-
-    elif b["BlockType"] == "LAYOUT_TEXT":
-        text = get_text_from_block(b, blocks)
-        draw_rectangle_with_text(
-            image, b["Geometry"]["BoundingBox"], f"TEXT: {text}", (255, 255, 0), 2, 0.5)
-
-# Second pass: Draw form elements
-for b in blocks:
-    if b["BlockType"] == "KEY_VALUE_SET":
-        text = get_text_from_block(b, blocks)
+# Z-order rank per BlockType: layout elements first (background), then form
+# elements, then table cells on top. Sorting once lets a single pass over
+# the blocks replace the three type-filtered loops.
+DRAW_RANK = {"LAYOUT_TABLE": 0, "LAYOUT_TEXT": 0, "KEY_VALUE_SET": 1, "CELL": 2}
+
+
+def get_block_style(b):
+    """Pick (label_prefix, color, thickness, font_scale) for a drawable block"""
+    btype = b["BlockType"]
+    if btype == "LAYOUT_TABLE":
+        return "TABLE: ", (0, 255, 255), 3, 0.6
+    if btype == "LAYOUT_TEXT":
+        return "TEXT: ", (255, 255, 0), 2, 0.5
+    if btype == "KEY_VALUE_SET":
         # Check if it's a key or value
         entity_types = b.get("EntityTypes", [])
         if "KEY" in entity_types:
-            draw_rectangle_with_text(
-                image, b["Geometry"]["BoundingBox"], f"KEY: {text}", (0, 255, 0), 2, 0.4)
-        elif "VALUE" in entity_types:
-            draw_rectangle_with_text(
-                image, b["Geometry"]["BoundingBox"], f"VALUE: {text}", (0, 200, 0), 2, 0.4)
-        else:
-            draw_rectangle_with_text(
-                image, b["Geometry"]["BoundingBox"], f"FORM: {text}", (0, 150, 0), 2, 0.4)
-
-# Third pass: Draw table cells with enhanced header detection
+            return "KEY: ", (0, 255, 0), 2, 0.4
+        if "VALUE" in entity_types:
+            return "VALUE: ", (0, 200, 0), 2, 0.4
+    return "FORM: ", (0, 150, 0), 2, 0.4
+
+
+# CELL styles: first row is typically header - bright red; the rest light
+# blue. Kept as constants so the cell loop below stays branch-light.
+HEADER_CELL_STYLE = ("H: ", (0, 0, 255), 2, 0.5)
+BODY_CELL_STYLE = ("", (255, 200, 100), 1, 0.3)
+
+
+# Bucket blocks by type once, then concatenate buckets in z-order: the
+# drawable list comes out rank-sorted without a comparison sort or a
+# per-block key lambda, and non-drawable types are filtered in the same pass
+blocks_by_type = {}
 for b in blocks:
+    blocks_by_type.setdefault(b["BlockType"], []).append(b)
+
+drawables = [
+    b
+    for btype in sorted(DRAW_RANK, key=DRAW_RANK.get)
+    for b in blocks_by_type.get(btype, ())]
+
+# Convert every bounding box to pixels in one vectorized multiply/cast
+# instead of four Python-level float->int conversions per block
+bb = np.array(
+    [[b["Geometry"]["BoundingBox"][k]
+      for k in ("Left", "Top", "Width", "Height")] for b in drawables],
+    dtype=np.float32).reshape(-1, 4)
+px = (bb * np.array([w, h, w, h], dtype=np.float32)).astype(np.int32)
+
+# Rectangle corner points for all blocks at once, (N, 4, 2) int32
+left, top = px[:, 0], px[:, 1]
+right, bottom = left + px[:, 2], top + px[:, 3]
+corners = np.stack([
+    np.stack([left, top], axis=1),
+    np.stack([right, top], axis=1),
+    np.stack([right, bottom], axis=1),
+    np.stack([left, bottom], axis=1),
+], axis=1).astype(np.int32)
+
+# Batch the rectangle borders: one cv2.polylines call per (color, thickness)
+# style instead of one cv2.rectangle Python->C transition per block. Styles
+# are first seen in z-order, so the group draw order matches the old passes.
+style_groups = {}
+labels = []
+for i, b in enumerate(drawables):
+    text = text_for(b["Id"])
     if b["BlockType"] == "CELL":
-        box = b["Geometry"]["BoundingBox"]
-        text = get_text_from_block(b, blocks)
-
-        # Determine if this is likely a header cell
-        row_index = b.get("RowIndex", 0)
-        is_header = row_index == 1  # First row is typically header
-
-        if is_header:
-            # Header cells - bright red
-            draw_rectangle_with_text(
-                image, box, f"H: {text}", (0, 0, 255), 2, 0.5)
-        else:
-            # Regular cells - light blue
-            label = text if text else f"R{b.get('RowIndex')}-C{b.get('ColumnIndex')}"
-            draw_rectangle_with_text(
-                image, box, label, (255, 200, 100), 1, 0.3)
+        # Bind the grid indices once; they feed both the header check and
+        # the empty-cell fallback label
+        ri = b.get("RowIndex")
+        prefix, color, thickness, font_scale = (
+            HEADER_CELL_STYLE if ri == 1 else BODY_CELL_STYLE)
+        if not prefix and not text:
+            # Empty non-header cells fall back to their grid position
+            text = f"R{ri}-C{b.get('ColumnIndex')}"
+    else:
+        prefix, color, thickness, font_scale = get_block_style(b)
+    style_groups.setdefault((color, thickness), []).append(i)
+    # Final label built (and truncated) once so the glyph cache keys on the
+    # exact drawn string
+    label = f"{prefix}{text}"[:30]
+    if label:
+        labels.append((label, px[i, 0], px[i, 1], color,
+                       thickness, font_scale))
+
+# Draw each pass top-to-bottom: rectangles within a style group share one
+# color, so reordering them is output-neutral, and the sweep touches image
+# rows in stripes instead of bouncing across the buffer. The label pass
+# sorts the same way (stable, so equal-y labels keep their z-order).
+for (color, thickness), idx in style_groups.items():
+    idx = sorted(idx, key=lambda i: int(top[i]))
+    if _stroke_rects is not None:
+        _stroke_rects(image, px[np.array(idx, dtype=np.intp)],
+                      color[0], color[1], color[2], thickness)
+    else:
+        cv2.polylines(image, list(corners[idx]), True, color, thickness)
+
+labels.sort(key=itemgetter(2, 1))
+for label, x, y, color, thickness, font_scale in labels:
+    # baseline sits where putText used to put it
+    patch, alpha, text_h = render_label(label, font_scale, color, thickness)
+    blit_label(image, patch, alpha, x + 2, y + 15 - text_h)
 
 # === save & display ===
 cv2.imwrite(OUT_PATH, image)
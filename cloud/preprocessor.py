@@ -64,32 +64,148 @@ Example:
 }
 """
 
-import json
 import argparse
-import re
+import logging
+import sys
 from pathlib import Path
-from collections import defaultdict
-from typing import List, Dict, Any
-
-
-def to_snake_case(text: str) -> str:
-    """Convert text to snake_case format."""
-    if not text:
-        return ""
-    text = text.strip().lower()
-    text = text.replace("#", " number ")
-    text = re.sub(r"[^a-z0-9]+", "_", text)
-    text = re.sub(r"_+", "_", text).strip("_")
-    return text
-
-
-# ======================================================
-# Utilities
-# ======================================================
-
-def load_json(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, groupby, repeat
+from operator import itemgetter
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+from textract_utils import load_json, save_json, to_snake_case
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Hot-path debug output goes through the logger with %s-deferred formatting
+# so non-debug runs never pay for string building.
+log = logging.getLogger(__name__)
+
+# Basic row types indexed by the code returned from the classification kernel.
+_BASIC_TYPES = ("EMPTY", "PRINTED_ONLY", "HANDWRITING_ONLY", "MIXED")
+_BT_EMPTY, _BT_PRINTED, _BT_HAND, _BT_MIXED = range(4)
+
+# Bound once: " ".join(map(_get_text, words)) skips a Python-level
+# generator frame per row in the text-join hot spots.
+_get_text = itemgetter("text")
+
+# Compass directions that mark hierarchical (merged) header keys, built once
+# instead of a fresh list per header.
+_COMPASS = ("north", "east", "west", "south")
+
+# Lightweight per-cell reference used when assembling the rows output; a
+# namedtuple keeps sorting and field access at C level with no per-cell
+# __dict__ allocation.
+_CellRef = namedtuple("_CellRef", ("col", "cell", "is_merged"))
+
+# TextType strings mapped to the uint8 codes used by the classifier, assigned
+# once at WORD ingest so the hot loops compare small ints instead of strings.
+_TT_CODE = {"PRINTED": 0, "HANDWRITING": 1}
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _classify_rows_kernel(flat_codes, offsets, out_codes,
+                              out_printed, out_hand):
+        """Classify every row in one parallel pass.
+
+        flat_codes holds all rows' uint8 type codes back to back; offsets is
+        the CSR-style boundary array (len(rows) + 1). Rows are independent so
+        the outer loop runs under prange. out_codes gets the 2-bit basic-type
+        label (bit 1 = any handwriting, bit 0 = any printed) that indexes
+        _BASIC_TYPES.
+        """
+        for r in prange(offsets.shape[0] - 1):
+            printed = 0
+            hand = 0
+            for i in range(offsets[r], offsets[r + 1]):
+                if flat_codes[i] == 0:
+                    printed += 1
+                else:
+                    hand += 1
+            out_codes[r] = (hand > 0) * 2 + (printed > 0)
+            out_printed[r] = printed
+            out_hand[r] = hand
+else:
+    _classify_rows_kernel = None
+
+
+# Batched forms of the bbox predicates below. Boxes are (N, 4) float arrays
+# of (Left, Top, Width, Height) rows; the result is an (N, M) boolean matrix.
+# With numba the pairwise sweep runs as parallel native code; the fallback
+# broadcasts in NumPy.
+if njit is not None:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _bboxes_overlap_batch(boxes_a, boxes_b, threshold=0.05):
+        n = boxes_a.shape[0]
+        m = boxes_b.shape[0]
+        out = np.zeros((n, m), dtype=np.bool_)
+        for i in prange(n):
+            a_left = boxes_a[i, 0]
+            a_top = boxes_a[i, 1]
+            a_area = boxes_a[i, 2] * boxes_a[i, 3]
+            a_right = a_left + boxes_a[i, 2]
+            a_bottom = a_top + boxes_a[i, 3]
+            for j in range(m):
+                left = max(a_left, boxes_b[j, 0])
+                right = min(a_right, boxes_b[j, 0] + boxes_b[j, 2])
+                top = max(a_top, boxes_b[j, 1])
+                bottom = min(a_bottom, boxes_b[j, 1] + boxes_b[j, 3])
+                if left < right and top < bottom:
+                    overlap_area = (right - left) * (bottom - top)
+                    min_area = min(a_area, boxes_b[j, 2] * boxes_b[j, 3])
+                    if min_area > 0 and overlap_area / min_area > threshold:
+                        out[i, j] = True
+        return out
+
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _bboxes_close_batch(boxes_a, boxes_b, max_distance=0.1):
+        n = boxes_a.shape[0]
+        m = boxes_b.shape[0]
+        max_sq = max_distance * max_distance
+        out = np.zeros((n, m), dtype=np.bool_)
+        for i in prange(n):
+            ax = boxes_a[i, 0] + boxes_a[i, 2] * 0.5
+            ay = boxes_a[i, 1] + boxes_a[i, 3] * 0.5
+            for j in range(m):
+                dx = ax - (boxes_b[j, 0] + boxes_b[j, 2] * 0.5)
+                dy = ay - (boxes_b[j, 1] + boxes_b[j, 3] * 0.5)
+                if dx * dx + dy * dy < max_sq:
+                    out[i, j] = True
+        return out
+else:
+    def _bboxes_overlap_batch(boxes_a, boxes_b, threshold=0.05):
+        a_left = boxes_a[:, 0:1]
+        a_top = boxes_a[:, 1:2]
+        a_w = boxes_a[:, 2:3]
+        a_h = boxes_a[:, 3:4]
+        b_left = boxes_b[None, :, 0]
+        b_top = boxes_b[None, :, 1]
+        b_w = boxes_b[None, :, 2]
+        b_h = boxes_b[None, :, 3]
+        inter_w = np.minimum(a_left + a_w, b_left + b_w) - \
+            np.maximum(a_left, b_left)
+        inter_h = np.minimum(a_top + a_h, b_top + b_h) - \
+            np.maximum(a_top, b_top)
+        overlap_area = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+        min_area = np.minimum(a_w * a_h, b_w * b_h)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(min_area > 0, overlap_area / min_area, 0.0)
+        return ratio > threshold
+
+    def _bboxes_close_batch(boxes_a, boxes_b, max_distance=0.1):
+        ax = boxes_a[:, 0:1] + boxes_a[:, 2:3] * 0.5
+        ay = boxes_a[:, 1:2] + boxes_a[:, 3:4] * 0.5
+        bx = boxes_b[None, :, 0] + boxes_b[None, :, 2] * 0.5
+        by = boxes_b[None, :, 1] + boxes_b[None, :, 3] * 0.5
+        dx = ax - bx
+        dy = ay - by
+        return dx * dx + dy * dy < max_distance * max_distance
 
 
 # ======================================================
@@ -119,8 +235,15 @@ class HandwrittenTableForm(BaseFormProcessor):
 
         self.assign_row_types(rows)
 
+        # Partition rows by assigned type once; downstream helpers consume
+        # the buckets instead of re-filtering the full list.
+        rows_by_type = defaultdict(list)
+        for row in rows:
+            rows_by_type[row["row_type"]].append(row)
+
         # Extract universal fields from UNIVERSAL rows and KEY_VALUE_SET blocks
-        universal_fields = self.extract_universal_fields(rows)
+        universal_fields = self.extract_universal_fields(
+            rows_by_type.get("UNIVERSAL", ()))
 
         # Analyze KEY_VALUE_SET blocks for debugging
         if debug:
@@ -132,12 +255,13 @@ class HandwrittenTableForm(BaseFormProcessor):
         universal_fields.update(key_value_fields)
 
         # Build hierarchical header map using MERGED_CELL and ColumnSpan information
-        header_map = self.build_header_map_from_cells(
-            textract_json, rows, debug)
+        header_map, column_order = self.build_header_map_from_cells(
+            textract_json, rows_by_type.get("HEADER", ()), debug)
 
         # Create structured output with system information
         structured_output = self.create_structured_output(
-            textract_json, rows, universal_fields, header_map, debug)
+            textract_json, rows, universal_fields, header_map, column_order,
+            debug)
 
         print(f"✅ Classified {len(rows)} rows:\n")
         if universal_fields:
@@ -157,80 +281,114 @@ class HandwrittenTableForm(BaseFormProcessor):
             import json
             print(json.dumps(structured_output, indent=2))
 
+        # Buffer the per-row report and flush it in one write: a print per
+        # row (two in debug) means a stdout lock + flush per row.
+        lines = []
         for idx, row in enumerate(rows, start=1):
-            text_preview = " ".join(w["text"] for w in row["words"])[:120]
-            print(f"Row {idx:02d} → {row['row_type']}: {text_preview}")
+            text_preview = " ".join(map(_get_text, row["words"]))[:120]
+            lines.append(f"Row {idx:02d} → {row['row_type']}: {text_preview}")
             if debug:
-                printed = sum(1 for w in row["words"]
-                              if w["text_type"] == "PRINTED")
-                hand = sum(1 for w in row["words"]
-                           if w["text_type"] == "HANDWRITING")
-                print(
+                printed = row["printed_count"]
+                hand = row["hand_count"]
+                lines.append(
                     f"   • total_words={len(row['words'])}, printed={printed}, handwriting={hand}")
 
-                # Show which cells contain handwriting
+                # Show which cells contain handwriting, grouped by column
+                # via np.unique on the int column array instead of a
+                # string-keyed dict build per row
                 if hand > 0:
-                    hand_cells = {}
-                    for w in row["words"]:
-                        if w["text_type"] == "HANDWRITING":
-                            col = w.get("column_index", "?")
-                            if col not in hand_cells:
-                                hand_cells[col] = []
-                            hand_cells[col].append(w["text"])
-
-                    for col, texts in hand_cells.items():
-                        print(
+                    row_words = row["words"]
+                    cols = np.fromiter(
+                        (w["column_index"] for w in row_words),
+                        dtype=np.int64, count=len(row_words))
+                    codes = np.fromiter(
+                        (w["tt_code"] for w in row_words),
+                        dtype=np.uint8, count=len(row_words))
+                    hand_idx = np.nonzero(codes == 1)[0]
+                    hand_cols, inverse = np.unique(
+                        cols[hand_idx], return_inverse=True)
+                    buckets = [[] for _ in hand_cols]
+                    for bucket_i, word_i in zip(inverse, hand_idx):
+                        buckets[bucket_i].append(row_words[word_i]["text"])
+
+                    for col, texts in zip(hand_cols, buckets):
+                        lines.append(
                             f"   • Column {col} handwriting: {' '.join(texts)}")
 
+        sys.stdout.write("\n".join(lines) + "\n")
+
         return structured_output
 
     # --------------------------
     # Helpers
     # --------------------------
 
-    def extract_universal_fields(self, rows: List[Dict[str, Any]]) -> Dict[str, str]:
+    _INDEXED_BLOCK_TYPES = (
+        "WORD", "CELL", "MERGED_CELL", "LAYOUT_TEXT", "KEY_VALUE_SET")
+
+    def _index_blocks(self, textract_json: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Build the by-Id block maps for a document in a single pass.
+
+        Several helpers need the same WORD/CELL/MERGED_CELL/... indices
+        during one classify call; rebuilding them per helper meant 5-6 full
+        scans over Blocks. The index is cached per document so repeat calls
+        are free; the cache holds the document itself and compares with
+        "is", so a recycled object id can never alias a new document to a
+        stale index.
+        """
+        cached = getattr(self, "_block_index_cache", None)
+        if cached is not None and cached[0] is textract_json:
+            return cached[1]
+
+        index: Dict[str, Dict[str, Any]] = {
+            block_type: {} for block_type in self._INDEXED_BLOCK_TYPES}
+        intern = sys.intern
+        for block in textract_json.get("Blocks", []):
+            # Interned BlockType hits the identity fast path in the bucket
+            # lookup; the source blocks themselves are left untouched (the
+            # simdjson document is read-only).
+            bucket = index.get(intern(block["BlockType"]))
+            if bucket is not None:
+                bucket[block["Id"]] = block
+
+        self._block_index_cache = (textract_json, index)
+        return index
+
+    def extract_universal_fields(self, universal_rows: List[Dict[str, Any]]) -> Dict[str, str]:
         """Extract universal fields from UNIVERSAL rows with key:value or key-value patterns."""
         universal_fields = {}
 
-        for row in rows:
-            if row.get("row_type") != "UNIVERSAL":
-                continue
-
+        for row in universal_rows:
             # Get the full text of the row
-            text = " ".join(w["text"] for w in row["words"])
-
-            # Look for key:value or key-value patterns
-            for separator in [":", "-"]:
-                if separator in text:
-                    parts = text.split(separator, 1)
-                    if len(parts) == 2:
-                        key = parts[0].strip()
-                        value = parts[1].strip()
-
-                        # Convert key to snake_case
-                        snake_key = to_snake_case(key)
-                        if snake_key and value:
-                            universal_fields[snake_key] = value
-                            break  # Only use the first separator found
+            text = " ".join(map(_get_text, row["words"]))
+
+            # Look for key:value or key-value patterns. partition scans the
+            # text once per separator (vs the `in` test plus split).
+            for separator in (":", "-"):
+                key, sep, value = text.partition(separator)
+                if not sep:
+                    continue
+                key = key.strip()
+                value = value.strip()
+
+                # Convert key to snake_case
+                snake_key = to_snake_case(key)
+                if snake_key and value:
+                    universal_fields[snake_key] = value
+                    break  # Only use the first separator found
 
         return universal_fields
 
     def analyze_key_value_sets(self, textract_json: Dict[str, Any]) -> None:
         """Analyze all KEY_VALUE_SET blocks to understand their structure."""
-        # Build a map of all WORD blocks by ID
-        word_map = {}
-        for block in textract_json.get("Blocks", []):
-            if block["BlockType"] == "WORD":
-                word_map[block["Id"]] = block
+        block_index = self._index_blocks(textract_json)
+        word_map = block_index["WORD"]
 
         print("🔍 KEY_VALUE_SET Analysis:")
         print("=" * 50)
 
         kv_count = 0
-        for block in textract_json.get("Blocks", []):
-            if block["BlockType"] != "KEY_VALUE_SET":
-                continue
-
+        for block in block_index["KEY_VALUE_SET"].values():
             kv_count += 1
             print(f"\nKEY_VALUE_SET #{kv_count}:")
             print(f"  ID: {block['Id']}")
@@ -261,30 +419,22 @@ class HandwrittenTableForm(BaseFormProcessor):
         """Extract universal fields from KEY_VALUE_SET blocks using explicit VALUE relationships."""
         key_value_fields = {}
 
-        # Build maps of all blocks by ID
-        word_map = {}
-        kv_map = {}
-        for block in textract_json.get("Blocks", []):
-            if block["BlockType"] == "WORD":
-                word_map[block["Id"]] = block
-            elif block["BlockType"] == "KEY_VALUE_SET":
-                kv_map[block["Id"]] = block
+        block_index = self._index_blocks(textract_json)
+        word_map = block_index["WORD"]
+        kv_map = block_index["KEY_VALUE_SET"]
 
         # Process KEY_VALUE_SET blocks that have VALUE relationships
-        for block in textract_json.get("Blocks", []):
-            if block["BlockType"] != "KEY_VALUE_SET":
-                continue
-
+        for block in kv_map.values():
             # Extract key from CHILD relationships
-            key_text = ""
-            value_text = ""
+            key_parts = []
+            value_parts = []
 
             for relationship in block.get("Relationships", []):
                 if relationship["Type"] == "CHILD":
                     # These are the KEY words
                     for word_id in relationship["Ids"]:
                         if word_id in word_map:
-                            key_text += word_map[word_id]["Text"] + " "
+                            key_parts.append(word_map[word_id]["Text"])
 
                 elif relationship["Type"] == "VALUE":
                     # Follow the VALUE relationship to get the value
@@ -296,10 +446,11 @@ class HandwrittenTableForm(BaseFormProcessor):
                                 if value_rel["Type"] == "CHILD":
                                     for word_id in value_rel["Ids"]:
                                         if word_id in word_map:
-                                            value_text += word_map[word_id]["Text"] + " "
+                                            value_parts.append(
+                                                word_map[word_id]["Text"])
 
-            key_text = key_text.strip()
-            value_text = value_text.strip()
+            key_text = " ".join(key_parts)
+            value_text = " ".join(value_parts)
 
             if debug and key_text and value_text:
                 print(f"🔍 KEY_VALUE_SET: '{key_text}' -> '{value_text}'")
@@ -322,47 +473,41 @@ class HandwrittenTableForm(BaseFormProcessor):
 
         table_top = min(row["y_mid"] for row in rows)
 
-        # Build maps of all blocks by ID
-        word_map = {}
-        kv_map = {}
-        for block in textract_json.get("Blocks", []):
-            if block["BlockType"] == "WORD":
-                word_map[block["Id"]] = block
-            elif block["BlockType"] == "KEY_VALUE_SET":
-                kv_map[block["Id"]] = block
+        block_index = self._index_blocks(textract_json)
+        word_map = block_index["WORD"]
+        kv_map = block_index["KEY_VALUE_SET"]
 
         if debug:
             print(f"🔍 Table top boundary: {table_top:.3f}")
 
-        # Process KEY_VALUE_SET blocks that are above the table
-        kv_blocks_above_table = 0
-        kv_blocks_in_table = 0
+        # Partition KEY_VALUE_SET blocks against the table top with one
+        # vectorized compare over a float32 Top array; the above/in-table
+        # tallies fall out as len() calls.
+        kv_blocks = list(kv_map.values())
+        kv_tops = np.fromiter(
+            (block["Geometry"]["BoundingBox"]["Top"] for block in kv_blocks),
+            dtype=np.float32, count=len(kv_blocks))
+        above_mask = kv_tops < table_top
+        kv_above_table = [kv_blocks[i] for i in np.flatnonzero(above_mask)]
+        kv_blocks_above_table = len(kv_above_table)
+        kv_blocks_in_table = len(kv_blocks) - kv_blocks_above_table
 
-        for block in textract_json.get("Blocks", []):
-            if block["BlockType"] != "KEY_VALUE_SET":
-                continue
-
-            # Check if this KEY_VALUE_SET block is above the table
-            block_y = block["Geometry"]["BoundingBox"]["Top"]
-            if block_y >= table_top:
-                kv_blocks_in_table += 1
-                if debug:
-                    print(
-                        f"🔍 Skipping KEY_VALUE_SET in table at Y={block_y:.3f}")
-                continue
-
-            kv_blocks_above_table += 1
+        if debug:
+            for i in np.flatnonzero(~above_mask):
+                print(
+                    f"🔍 Skipping KEY_VALUE_SET in table at Y={kv_tops[i]:.3f}")
 
+        for block in kv_above_table:
             # Extract key from CHILD relationships
-            key_text = ""
-            value_text = ""
+            key_parts = []
+            value_parts = []
 
             for relationship in block.get("Relationships", []):
                 if relationship["Type"] == "CHILD":
                     # These are the KEY words
                     for word_id in relationship["Ids"]:
                         if word_id in word_map:
-                            key_text += word_map[word_id]["Text"] + " "
+                            key_parts.append(word_map[word_id]["Text"])
 
                 elif relationship["Type"] == "VALUE":
                     # Follow the VALUE relationship to get the value
@@ -374,14 +519,15 @@ class HandwrittenTableForm(BaseFormProcessor):
                                 if value_rel["Type"] == "CHILD":
                                     for word_id in value_rel["Ids"]:
                                         if word_id in word_map:
-                                            value_text += word_map[word_id]["Text"] + " "
+                                            value_parts.append(
+                                                word_map[word_id]["Text"])
 
-            key_text = key_text.strip()
-            value_text = value_text.strip()
+            key_text = " ".join(key_parts)
+            value_text = " ".join(value_parts)
 
             if debug and key_text and value_text:
-                print(
-                    f"🔍 Universal KEY_VALUE_SET: '{key_text}' -> '{value_text}'")
+                log.debug("🔍 Universal KEY_VALUE_SET: '%s' -> '%s'",
+                          key_text, value_text)
 
             if key_text and value_text:
                 # Convert key to snake_case
@@ -395,112 +541,133 @@ class HandwrittenTableForm(BaseFormProcessor):
 
         return key_value_fields
 
-    def build_header_map_from_cells(self, textract_json: Dict[str, Any], rows: List[Dict[str, Any]], debug: bool = False) -> Dict[str, List[str]]:
-        """Build hierarchical header map using MERGED_CELL and ColumnSpan information."""
+    def build_header_map_from_cells(self, textract_json: Dict[str, Any], header_rows: List[Dict[str, Any]],
+                                    debug: bool = False) -> Tuple[Dict[str, List[str]], List[Tuple[int, str]]]:
+        """Build hierarchical header map using MERGED_CELL and ColumnSpan information.
+
+        header_rows is the HEADER bucket from classify_rows' partition.
+        Returns (header_map, column_order) where column_order is the list of
+        (column_index, snake_key) pairs in header order.
+        """
         header_map = {}
         column_order = []  # Track column order
 
-        # Build maps of all blocks by ID
-        word_map = {}
-        cell_map = {}
-        merged_cell_map = {}
-        layout_text_map = {}
+        block_index = self._index_blocks(textract_json)
+        word_map = block_index["WORD"]
+        cell_map = block_index["CELL"]
+        merged_cell_map = block_index["MERGED_CELL"]
+        layout_text_map = block_index["LAYOUT_TEXT"]
 
-        for block in textract_json.get("Blocks", []):
-            if block["BlockType"] == "WORD":
-                word_map[block["Id"]] = block
-            elif block["BlockType"] == "CELL":
-                cell_map[block["Id"]] = block
-            elif block["BlockType"] == "MERGED_CELL":
-                merged_cell_map[block["Id"]] = block
-            elif block["BlockType"] == "LAYOUT_TEXT":
-                layout_text_map[block["Id"]] = block
+        # Text extraction memo for this call: merged-cell and cell passes
+        # revisit the same blocks/subtrees
+        text_memo: Dict[str, str] = {}
 
         if debug:
             print(
                 f"🔍 Found {len(cell_map)} CELL blocks, {len(merged_cell_map)} MERGED_CELL blocks, {len(layout_text_map)} LAYOUT_TEXT blocks")
 
         # Get header row indices from our classified rows
-        header_row_indices = set()
-        for row in rows:
-            if row.get("row_type") == "HEADER":
-                header_row_indices.add(row["row_index"])
+        header_row_indices = frozenset(
+            row["row_index"] for row in header_rows)
 
         if debug:
             print(f"🔍 Header row indices: {sorted(header_row_indices)}")
 
-        # Process MERGED_CELL blocks first (they take priority) - only in header rows
-        merged_cell_info = {}  # Store info about merged cells for hierarchical mapping
+        # Process MERGED_CELL blocks first (they take priority) - only in
+        # header rows. One fused pass populates the hierarchical-mapping
+        # info and the per-row covered-column sets.
+        merged_cell_info = []  # Info about merged cells for hierarchical mapping
+        covered = set()  # Flat (row, col) pairs covered by merged cells
 
-        for merged_id, merged_cell in merged_cell_map.items():
+        # Bound membership test saves the attribute lookup per iteration in
+        # the two block-sized loops below
+        in_header = header_row_indices.__contains__
+
+        # Iterate values directly (the Id is only needed for debug output)
+        # and check the header row before touching the column fields
+        for merged_cell in merged_cell_map.values():
             row_index = merged_cell.get("RowIndex", 0)
 
             # Only process MERGED_CELLs in header rows
-            if row_index not in header_row_indices:
+            if not in_header(row_index):
                 continue
 
             if debug:
-                print(
-                    f"🔍 Processing MERGED_CELL {merged_id} in header row {row_index} (RowIndex: {merged_cell.get('RowIndex', 'N/A')})")
+                log.debug(
+                    "🔍 Processing MERGED_CELL %s in header row %s",
+                    merged_cell["Id"], row_index)
+
+            col_start = merged_cell.get("ColumnIndex", 0)
+            col_span = merged_cell.get("ColumnSpan", 1)
+            col_range = range(col_start, col_start + col_span)
+            covered.update((row_index, col) for col in col_range)
 
             # Extract text by following relationships
             merged_text = self._extract_text_from_relationships(
-                merged_cell, word_map, cell_map, layout_text_map, debug)
+                merged_cell, word_map, cell_map, layout_text_map, debug,
+                text_memo)
 
             if merged_text:
-                col_start = merged_cell.get("ColumnIndex", 0)
-                col_span = merged_cell.get("ColumnSpan", 1)
-
                 # Store merged cell info for hierarchical mapping
-                merged_cell_info[merged_id] = {
+                merged_info = {
                     "text": merged_text,
                     "col_start": col_start,
                     "col_span": col_span,
                     "row_index": row_index
                 }
+                merged_cell_info.append(merged_info)
 
                 if debug:
-                    print(
-                        f"   MERGED_CELL spans columns {col_start}-{col_start + col_span - 1}: {merged_text}")
-
-        # Process regular CELL blocks that aren't covered by MERGED_CELLs - only in header rows
-        covered_columns_by_row = {}  # Track covered columns per row
-        for merged_cell in merged_cell_map.values():
-            row_index = merged_cell.get("RowIndex", 0)
-            if row_index in header_row_indices:
-                col_start = merged_cell.get("ColumnIndex", 0)
-                col_span = merged_cell.get("ColumnSpan", 1)
-                if row_index not in covered_columns_by_row:
-                    covered_columns_by_row[row_index] = set()
-                for col in range(col_start, col_start + col_span):
-                    covered_columns_by_row[row_index].add(col)
+                    log.debug(
+                        "   MERGED_CELL spans columns %s-%s: %s",
+                        col_start, col_start + col_span - 1, merged_text)
 
         if debug:
-            for row_idx, cols in covered_columns_by_row.items():
+            cols_by_row = defaultdict(list)
+            for row_idx, col in covered:
+                cols_by_row[row_idx].append(col)
+            for row_idx, cols in cols_by_row.items():
                 print(f"🔍 Row {row_idx} covered columns: {sorted(cols)}")
 
+        # Exact (row, col) -> parent index: every merged cell is expanded
+        # once over its span for the header rows strictly below it, so the
+        # per-header-cell parent lookup becomes a single dict probe instead
+        # of a scan over the merged cells. setdefault keeps the first merged
+        # cell seen per slot, matching the old scan order.
+        parent_index = {}
+        for info in merged_cell_info:
+            for r in header_row_indices:
+                if r <= info["row_index"]:
+                    continue
+                for c in range(info["col_start"],
+                               info["col_start"] + info["col_span"]):
+                    parent_index.setdefault((r, c), info)
+
         # Collect all header cells with their column indices for proper ordering
         header_cells = []
 
-        for cell_id, cell in cell_map.items():
+        for cell in cell_map.values():
             row_index = cell.get("RowIndex", 0)
-            col_index = cell.get("ColumnIndex", 0)
 
-            # Only process CELLs in header rows
-            if row_index not in header_row_indices:
+            # Only process CELLs in header rows; the column index is only
+            # fetched for survivors
+            if not in_header(row_index):
                 continue
 
-            # Skip if this column is covered by a MERGED_CELL in the same row
-            if (row_index in covered_columns_by_row and
-                    col_index in covered_columns_by_row[row_index]):
+            col_index = cell.get("ColumnIndex", 0)
+
+            # Skip if this column is covered by a MERGED_CELL in the same
+            # row; one hash probe on the flat pair set
+            if (row_index, col_index) in covered:
                 if debug:
-                    print(
-                        f"   Skipping CELL row {row_index} column {col_index} (covered by MERGED_CELL in same row)")
+                    log.debug(
+                        "   Skipping CELL row %s column %s (covered by MERGED_CELL in same row)",
+                        row_index, col_index)
                 continue
 
             # Extract text from this cell
             cell_text = self._extract_text_from_relationships(
-                cell, word_map, cell_map, layout_text_map, debug)
+                cell, word_map, cell_map, layout_text_map, debug, text_memo)
 
             if cell_text:
                 header_cells.append((row_index, col_index, cell_text))
@@ -511,13 +678,7 @@ class HandwrittenTableForm(BaseFormProcessor):
         # Process header cells in order
         for row_index, col_index, cell_text in header_cells:
             # Check if this cell is under a merged cell (hierarchical relationship)
-            parent_merged_cell = None
-            for merged_id, merged_info in merged_cell_info.items():
-                if (merged_info["row_index"] < row_index and  # Merged cell is in a higher row
-                    col_index >= merged_info["col_start"] and
-                        col_index < merged_info["col_start"] + merged_info["col_span"]):
-                    parent_merged_cell = merged_info
-                    break
+            parent_merged_cell = parent_index.get((row_index, col_index))
 
             if parent_merged_cell:
                 # This cell is under a merged cell - create hierarchical key
@@ -526,15 +687,18 @@ class HandwrittenTableForm(BaseFormProcessor):
                 snake_key = to_snake_case(combined_text)
 
                 if debug:
-                    print(
-                        f"   HIERARCHICAL CELL row {row_index} column {col_index}: {snake_key} -> {combined_text} (under '{parent_text}')")
+                    log.debug(
+                        "   HIERARCHICAL CELL row %s column %s: %s -> %s (under '%s')",
+                        row_index, col_index, snake_key, combined_text,
+                        parent_text)
             else:
                 # Regular cell not under a merged cell
                 snake_key = to_snake_case(cell_text)
 
                 if debug:
-                    print(
-                        f"   REGULAR CELL row {row_index} column {col_index}: {snake_key} -> {cell_text}")
+                    log.debug(
+                        "   REGULAR CELL row %s column %s: %s -> %s",
+                        row_index, col_index, snake_key, cell_text)
 
             if snake_key:
                 header_map[snake_key] = [
@@ -545,65 +709,90 @@ class HandwrittenTableForm(BaseFormProcessor):
         if debug:
             print(f"🔍 Column order: {[col for col, key in column_order]}")
 
-        # Store column order in the header map for later use
-        header_map["_column_order"] = column_order
-
-        return header_map
+        # Returned alongside the header map instead of stashed under a
+        # sentinel key, so consumers iterate the map without filtering
+        return header_map, column_order
 
     def _extract_text_from_relationships(self, block: Dict[str, Any], word_map: Dict[str, Any],
                                          cell_map: Dict[str, Any], layout_text_map: Dict[str, Any],
-                                         debug: bool = False) -> str:
-        """Extract text by following relationships from a block."""
-        text_parts = []
-
-        for relationship in block.get("Relationships", []):
-            if relationship["Type"] == "CHILD":
-                for child_id in relationship["Ids"]:
-                    # Check if it's a WORD
-                    if child_id in word_map:
-                        text_parts.append(word_map[child_id]["Text"])
-                        if debug:
-                            print(
-                                f"     Found WORD: '{word_map[child_id]['Text']}'")
-
-                    # Check if it's a CELL (follow its relationships)
-                    elif child_id in cell_map:
-                        cell_text = self._extract_text_from_relationships(
-                            cell_map[child_id], word_map, cell_map, layout_text_map, debug)
-                        if cell_text:
-                            text_parts.append(cell_text)
-                            if debug:
-                                print(f"     Found CELL text: '{cell_text}'")
-
-                    # Check if it's a LAYOUT_TEXT (follow its relationships)
-                    elif child_id in layout_text_map:
-                        layout_text = self._extract_text_from_relationships(
-                            layout_text_map[child_id], word_map, cell_map, layout_text_map, debug)
-                        if layout_text:
-                            text_parts.append(layout_text)
-                            if debug:
-                                print(
-                                    f"     Found LAYOUT_TEXT: '{layout_text}'")
-
-        return " ".join(text_parts).strip()
+                                         debug: bool = False,
+                                         memo: Dict[str, str] = None) -> str:
+        """Extract text by following relationships from a block.
+
+        Pass a memo dict to cache results by block Id: parents routinely
+        share CELL/LAYOUT_TEXT subtrees, and the merged-cell and cell passes
+        visit the same blocks twice.
+        """
+        if memo is not None:
+            cached = memo.get(block["Id"])
+            if cached is not None:
+                return cached
+
+        # Iterative DFS with an explicit frame stack: avoids Python's
+        # per-call overhead (and the recursion limit) on deeply nested
+        # CELL/LAYOUT_TEXT trees. Each frame keeps the block, its pending
+        # child-id iterator, and the text parts gathered so far.
+        stack = deque()
+        stack.append((block, self._iter_child_ids(block), []))
+        while stack:
+            current, child_ids, text_parts = stack[-1]
+            descended = False
+            for child_id in child_ids:
+                # Check if it's a WORD
+                if child_id in word_map:
+                    text_parts.append(word_map[child_id]["Text"])
+                    if debug:
+                        log.debug("     Found WORD: '%s'",
+                                  word_map[child_id]["Text"])
+
+                # Check if it's a CELL or LAYOUT_TEXT (follow its
+                # relationships)
+                elif child_id in cell_map or child_id in layout_text_map:
+                    child = cell_map.get(child_id) or layout_text_map[child_id]
+                    cached = memo.get(child_id) if memo is not None else None
+                    if cached is not None:
+                        if cached:
+                            text_parts.append(cached)
+                        continue
+                    stack.append((child, self._iter_child_ids(child), []))
+                    descended = True
+                    break
+
+            if descended:
+                continue
+
+            # Frame exhausted: fold its text into the parent (or return it)
+            stack.pop()
+            text = " ".join(text_parts).strip()
+            if memo is not None:
+                memo[current["Id"]] = text
+            if not stack:
+                return text
+            if text:
+                stack[-1][2].append(text)
+                if debug:
+                    log.debug("     Found %s text: '%s'",
+                              current["BlockType"], text)
+
+        return ""
+
+    @staticmethod
+    def _iter_child_ids(block: Dict[str, Any]):
+        """Flat iterator over a block's CHILD relationship ids."""
+        return chain.from_iterable(
+            rel["Ids"] for rel in block.get("Relationships", ())
+            if rel["Type"] == "CHILD")
 
     def create_structured_output(self, textract_json: Dict[str, Any], rows: List[Dict[str, Any]],
                                  universal_fields: Dict[str, str], header_map: Dict[str, List[str]],
+                                 column_order: List[Tuple[int, str]],
                                  debug: bool = False) -> Dict[str, Any]:
         """Create structured output with system information for each zone."""
 
-        # Build maps of all blocks by ID
-        word_map = {}
-        cell_map = {}
-        merged_cell_map = {}
-
-        for block in textract_json.get("Blocks", []):
-            if block["BlockType"] == "WORD":
-                word_map[block["Id"]] = block
-            elif block["BlockType"] == "CELL":
-                cell_map[block["Id"]] = block
-            elif block["BlockType"] == "MERGED_CELL":
-                merged_cell_map[block["Id"]] = block
+        block_index = self._index_blocks(textract_json)
+        word_map = block_index["WORD"]
+        cell_map = block_index["CELL"]
+        merged_cell_map = block_index["MERGED_CELL"]
 
         if debug:
             print("🔍 Creating structured output...")
@@ -622,7 +811,7 @@ class HandwrittenTableForm(BaseFormProcessor):
 
         # Create header_map with system info
         header_output = self._create_enhanced_header_map(
-            header_map, textract_json, rows, debug)
+            header_map, column_order, debug)
         header_bbox = self._get_header_map_bbox(textract_json, rows, debug)
         header_output["system"] = {
             "bbox": header_bbox,
@@ -631,9 +820,11 @@ class HandwrittenTableForm(BaseFormProcessor):
             "column_index": -1  # Header map doesn't have specific columns
         }
 
-        # Create rows with system info
+        # Create rows with system info (data rows filtered once here)
+        data_rows = [row for row in rows if row.get("row_type") == "DATA"]
         rows_output = self._create_rows_output(
-            textract_json, rows, header_map, cell_map, merged_cell_map, word_map, debug)
+            textract_json, data_rows, column_order, cell_map, merged_cell_map,
+            word_map, debug)
 
         structured_output = {
             "universal_fields": universal_output,
@@ -669,38 +860,34 @@ class HandwrittenTableForm(BaseFormProcessor):
             }
 
             if debug:
-                print(
-                    f"🔍 Enhanced universal field: {field_key} -> {field_value} (index: {field_index})")
+                log.debug(
+                    "🔍 Enhanced universal field: %s -> %s (index: %s)",
+                    field_key, field_value, field_index)
 
             field_index += 1
 
         return enhanced_universal_fields
 
-    def _create_enhanced_header_map(self, header_map: Dict[str, List[str]], textract_json: Dict[str, Any],
-                                    rows: List[Dict[str, Any]], debug: bool = False) -> Dict[str, Any]:
+    def _create_enhanced_header_map(self, header_map: Dict[str, List[str]],
+                                    column_order: List[Tuple[int, str]],
+                                    debug: bool = False) -> Dict[str, Any]:
         """Create enhanced header map with metadata and system info."""
 
         enhanced_header_map = {}
 
-        # Get column order from header map
-        column_order = header_map.get("_column_order", [])
-
         if debug:
             print(
                 f"🔍 Using column order: {[col for col, key in column_order]}")
 
         for col_index, header_key in column_order:
-            if header_key == "system" or header_key == "_column_order":  # Skip system keys
-                continue
-
             header_values = header_map[header_key]
 
             # Get the field name (first value in the list)
             field_name = header_values[0] if header_values else header_key
 
             # Determine if this is a merged field (contains hierarchical info)
-            merged = "_" in header_key and any(part in header_key for part in [
-                                               "north", "east", "west", "south"])
+            merged = "_" in header_key and any(
+                part in header_key for part in _COMPASS)
 
             # Create enhanced header entry with system subobject using actual Textract column index
             enhanced_header_map[header_key] = {
@@ -716,47 +903,66 @@ class HandwrittenTableForm(BaseFormProcessor):
             }
 
             if debug:
-                print(
-                    f"🔍 Enhanced header: {header_key} -> {field_name} (merged: {merged}, actual_col: {col_index})")
+                log.debug(
+                    "🔍 Enhanced header: %s -> %s (merged: %s, actual_col: %s)",
+                    header_key, field_name, merged, col_index)
 
         return enhanced_header_map
 
+    # Known field descriptions, built once at class creation instead of as a
+    # dict literal on every _get_field_description call.
+    _FIELD_DESCRIPTIONS = {
+        "block_code": "The code of the block in the study",
+        "transect_number": "The transect number within the block",
+        "plot_number": "The plot number within the transect",
+        "subplot_number": "The subplot number within the plot",
+        "canopy_openness_north": "Canopy openness measurement in the north direction",
+        "canopy_openness_east": "Canopy openness measurement in the east direction",
+        "canopy_openness_west": "Canopy openness measurement in the west direction",
+        "canopy_openness_south": "Canopy openness measurement in the south direction",
+        "soil_moisture": "Soil moisture level measurement",
+        "soil_temper_ature_in_2": "Soil temperature measurement at 2cm depth",
+        "soil_ph": "Soil pH level measurement",
+        "notes_on_plot_characteristics_disturbance_physical_features_forest_structure": "Notes on plot characteristics including disturbance, physical features, and forest structure"
+    }
+
     def _get_field_description(self, header_key: str, field_name: str) -> str:
         """Generate a description for a field based on its name."""
-        descriptions = {
-            "block_code": "The code of the block in the study",
-            "transect_number": "The transect number within the block",
-            "plot_number": "The plot number within the transect",
-            "subplot_number": "The subplot number within the plot",
-            "canopy_openness_north": "Canopy openness measurement in the north direction",
-            "canopy_openness_east": "Canopy openness measurement in the east direction",
-            "canopy_openness_west": "Canopy openness measurement in the west direction",
-            "canopy_openness_south": "Canopy openness measurement in the south direction",
-            "soil_moisture": "Soil moisture level measurement",
-            "soil_temper_ature_in_2": "Soil temperature measurement at 2cm depth",
-            "soil_ph": "Soil pH level measurement",
-            "notes_on_plot_characteristics_disturbance_physical_features_forest_structure": "Notes on plot characteristics including disturbance, physical features, and forest structure"
-        }
+        return self._FIELD_DESCRIPTIONS.get(header_key, f"Field: {field_name}")
 
-        return descriptions.get(header_key, f"Field: {field_name}")
-
-    def _create_rows_output(self, textract_json: Dict[str, Any], rows: List[Dict[str, Any]],
-                            header_map: Dict[str, List[str]], cell_map: Dict[str, Any],
+    def _create_rows_output(self, textract_json: Dict[str, Any], data_rows: List[Dict[str, Any]],
+                            column_order: List[Tuple[int, str]], cell_map: Dict[str, Any],
                             merged_cell_map: Dict[str, Any], word_map: Dict[str, Any], debug: bool = False) -> List[Dict[str, Any]]:
-        """Create rows output with header->value mapping and system info."""
-
-        # Get data rows only
-        data_rows = [row for row in rows if row.get("row_type") == "DATA"]
+        """Create rows output with header->value mapping and system info;
+        data_rows holds only the DATA-classified rows."""
 
         if debug:
             print(f"🔍 Processing {len(data_rows)} data rows")
 
         rows_output = []
 
+        # Column -> header key resolved once up front; every cell lookup is
+        # a dict probe instead of a scan over column_order.
+        col_to_header = self._col_to_header(column_order)
+
+        # Bucket regular and merged cells by RowIndex once, sorted by column
+        # at build time, so each data row is a dict probe instead of two
+        # full scans over the cell maps.
+        cells_by_row = defaultdict(list)
+        for cell in cell_map.values():
+            cells_by_row[cell.get("RowIndex")].append(
+                _CellRef(cell.get("ColumnIndex", 0), cell, False))
+        for merged_cell in merged_cell_map.values():
+            cells_by_row[merged_cell.get("RowIndex")].append(
+                _CellRef(merged_cell.get("ColumnIndex", 0), merged_cell, True))
+        for bucket in cells_by_row.values():
+            bucket.sort(key=itemgetter(0))
+
         for row_idx, data_row in enumerate(data_rows):
             if debug:
-                print(
-                    f"🔍 Processing data row {row_idx + 1} (RowIndex: {data_row['row_index']})")
+                log.debug(
+                    "🔍 Processing data row %s (RowIndex: %s)",
+                    row_idx + 1, data_row["row_index"])
 
             # Create row object with header->value mapping
             row_obj = {}
@@ -764,44 +970,25 @@ class HandwrittenTableForm(BaseFormProcessor):
 
             # Get all cells in this row
             row_index = data_row["row_index"]
-            cells_in_row = []
-
-            # Add regular cells
-            for cell_id, cell in cell_map.items():
-                if cell.get("RowIndex") == row_index:
-                    cells_in_row.append({
-                        "id": cell_id,
-                        "cell": cell,
-                        "type": "CELL"
-                    })
-
-            # Add merged cells
-            for merged_id, merged_cell in merged_cell_map.items():
-                if merged_cell.get("RowIndex") == row_index:
-                    cells_in_row.append({
-                        "id": merged_id,
-                        "cell": merged_cell,
-                        "type": "MERGED_CELL"
-                    })
-
-            # Sort cells by column index
-            cells_in_row.sort(key=lambda c: c["cell"].get("ColumnIndex", 0))
+            cells_in_row = cells_by_row.get(row_index, [])
 
             if debug:
-                print(f"   Found {len(cells_in_row)} cells in row {row_index}")
+                log.debug("   Found %s cells in row %s",
+                          len(cells_in_row), row_index)
 
             # Process each cell
-            for cell_info in cells_in_row:
-                cell = cell_info["cell"]
-                col_index = cell.get("ColumnIndex", 0)
+            for cell_ref in cells_in_row:
+                cell = cell_ref.cell
+                col_index = cell_ref.col
 
                 # Extract text from cell
                 cell_text = self._extract_text_from_relationships(
                     cell, word_map, cell_map, {}, debug=False)
 
-                # Get header for this column
-                header_key = self._get_header_for_column(
-                    col_index, header_map, debug)
+                # Get header for this column (generic name when unmapped)
+                header_key = col_to_header.get(col_index)
+                if header_key is None:
+                    header_key = f"col_{col_index}"
 
                 # Add to row object
                 row_obj[header_key] = cell_text
@@ -820,8 +1007,9 @@ class HandwrittenTableForm(BaseFormProcessor):
                 }
 
                 if debug:
-                    print(
-                        f"   Column {col_index}: {header_key} = '{cell_text}' (conf: {cell_confidence:.2f})")
+                    log.debug(
+                        "   Column %s: %s = '%s' (conf: %.2f)",
+                        col_index, header_key, cell_text, cell_confidence)
 
             # Add system info for the row
             row_bbox = self._get_row_bbox(cells_in_row)
@@ -837,19 +1025,40 @@ class HandwrittenTableForm(BaseFormProcessor):
 
         return rows_output
 
-    def _get_header_for_column(self, col_index: int, header_map: Dict[str, List[str]], debug: bool = False) -> str:
-        """Get the header key for a given Textract column index."""
-
-        # Get column order from header map
-        column_order = header_map.get("_column_order", [])
+    @staticmethod
+    def _col_to_header(column_order: List[Tuple[int, str]]) -> Dict[int, str]:
+        """Resolve column_order into a column -> header key dict.
 
-        # Find the header key for this column index
-        for col_idx, header_key in column_order:
-            if col_idx == col_index:
-                if debug:
-                    print(
-                        f"🔍 Mapped Textract col {col_index} to header: {header_key}")
-                return header_key
+        First-wins, matching the original linear scan: column_order holds
+        one entry per header cell in (row, col) order, so a column with
+        text cells in several header rows must keep the top row's key - a
+        plain dict(column_order) would silently take the bottom row's.
+        """
+        col_to_header: Dict[int, str] = {}
+        for col_index, header_key in column_order:
+            col_to_header.setdefault(col_index, header_key)
+        return col_to_header
+
+    def _get_header_for_column(self, col_index: int, column_order: List[Tuple[int, str]],
+                               debug: bool = False) -> str:
+        """Get the header key for a given Textract column index.
+
+        One hash probe instead of an O(columns) scan: the first-wins dict
+        from _col_to_header is memoized against the column_order object
+        (held + "is" compared, like the per-document caches), so repeat
+        calls for the same table don't rebuild it. The row-building loop
+        pre-builds the same dict itself and bypasses this method.
+        """
+        cached = getattr(self, "_col_header_cache", None)
+        if cached is None or cached[0] is not column_order:
+            cached = (column_order, self._col_to_header(column_order))
+            self._col_header_cache = cached
+        header_key = cached[1].get(col_index)
+        if header_key is not None:
+            if debug:
+                print(
+                    f"🔍 Mapped Textract col {col_index} to header: {header_key}")
+            return header_key
 
         # Fallback to generic column name if not found
         if debug:
@@ -857,26 +1066,45 @@ class HandwrittenTableForm(BaseFormProcessor):
                 f"🔍 No header found for Textract col {col_index}, using generic name")
         return f"col_{col_index}"
 
-    def _get_row_bbox(self, cells_in_row: List[Dict[str, Any]]) -> Dict[str, float]:
+    def _get_row_bbox(self, cells_in_row: List["_CellRef"]) -> Dict[str, float]:
         """Get bounding box for entire row."""
         if not cells_in_row:
             return {}
 
-        # Calculate union of all cell bounding boxes
-        left = min(cell["cell"].get("Geometry", {}).get(
-            "BoundingBox", {}).get("Left", 0) for cell in cells_in_row)
-        top = min(cell["cell"].get("Geometry", {}).get(
-            "BoundingBox", {}).get("Top", 0) for cell in cells_in_row)
-        right = max(cell["cell"].get("Geometry", {}).get("BoundingBox", {}).get("Left", 0) +
-                    cell["cell"].get("Geometry", {}).get("BoundingBox", {}).get("Width", 0) for cell in cells_in_row)
-        bottom = max(cell["cell"].get("Geometry", {}).get("BoundingBox", {}).get("Top", 0) +
-                     cell["cell"].get("Geometry", {}).get("BoundingBox", {}).get("Height", 0) for cell in cells_in_row)
+        # Calculate union of all cell bounding boxes: one (N, 4) array of
+        # L/T/W/H built in a single descent per cell, then two vectorized
+        # reductions instead of four generator-expression passes
+        coords = np.fromiter(
+            (v
+             for ref in cells_in_row
+             for bb in (ref.cell.get("Geometry", {}).get("BoundingBox", {}),)
+             for v in (bb.get("Left", 0), bb.get("Top", 0),
+                       bb.get("Width", 0), bb.get("Height", 0))),
+            dtype=np.float64, count=4 * len(cells_in_row)).reshape(-1, 4)
+        left, top = coords[:, :2].min(axis=0)
+        right, bottom = (coords[:, :2] + coords[:, 2:]).max(axis=0)
+
+        return {
+            "Left": float(left),
+            "Top": float(top),
+            "Width": float(right - left),
+            "Height": float(bottom - top)
+        }
 
+    @staticmethod
+    def _words_union_bbox(all_words: List[Dict[str, Any]]) -> Dict[str, float]:
+        """Union bbox of word midpoints with a small margin, via vectorized
+        min/max over one (N, 2) coordinate array."""
+        coords = np.fromiter(
+            chain.from_iterable((w["x_mid"], w["y_mid"]) for w in all_words),
+            dtype=np.float64, count=2 * len(all_words)).reshape(-1, 2)
+        left, top = coords.min(axis=0) - 0.01
+        right, bottom = coords.max(axis=0) + 0.01
         return {
-            "Left": left,
-            "Top": top,
-            "Width": right - left,
-            "Height": bottom - top
+            "Left": float(left),
+            "Top": float(top),
+            "Width": float(right - left),
+            "Height": float(bottom - top)
         }
 
     def _get_universal_fields_bbox(self, textract_json: Dict[str, Any], rows: List[Dict[str, Any]], debug: bool = False) -> Dict[str, float]:
@@ -899,29 +1127,24 @@ class HandwrittenTableForm(BaseFormProcessor):
             except Exception:
                 table_top = None
 
-        word_map: Dict[str, Any] = {}
-        for block in textract_json.get("Blocks", []):
-            if block.get("BlockType") == "WORD":
-                word_map[block["Id"]] = block
+        block_index = self._index_blocks(textract_json)
+        word_map = block_index["WORD"]
 
         kv_words = []
         if table_top is not None:
-            # Build map for VALUE follow-ups
-            kv_map: Dict[str, Any] = {}
-            for block in textract_json.get("Blocks", []):
-                if block.get("BlockType") == "KEY_VALUE_SET":
-                    kv_map[block["Id"]] = block
-
-            for block in textract_json.get("Blocks", []):
-                if block.get("BlockType") != "KEY_VALUE_SET":
-                    continue
-
-                block_top = block.get("Geometry", {}).get(
-                    "BoundingBox", {}).get("Top", 1.0)
-                # Only consider universal KV blocks ABOVE the table
-                if block_top >= table_top:
-                    continue
-
+            # Map for VALUE follow-ups
+            kv_map = block_index["KEY_VALUE_SET"]
+
+            # One vectorized compare picks the universal KV blocks ABOVE the
+            # table; only those survivors pay the relationship walk below
+            kv_blocks = list(kv_map.values())
+            kv_tops = np.fromiter(
+                (block.get("Geometry", {}).get("BoundingBox", {})
+                 .get("Top", 1.0) for block in kv_blocks),
+                dtype=np.float32, count=len(kv_blocks))
+
+            for i in np.flatnonzero(kv_tops < table_top):
+                block = kv_blocks[i]
                 # Gather key words (CHILD) and value words (VALUE -> CHILD)
                 for rel in block.get("Relationships", []):
                     if rel.get("Type") == "CHILD":
@@ -960,18 +1183,8 @@ class HandwrittenTableForm(BaseFormProcessor):
                     "🔍 No universal fields rows/KEY_VALUE_SET above table found for bbox")
             return {}
 
-        # Calculate union bbox with a small margin
-        left = min(w["x_mid"] - 0.01 for w in all_words)
-        right = max(w["x_mid"] + 0.01 for w in all_words)
-        top = min(w["y_mid"] - 0.01 for w in all_words)
-        bottom = max(w["y_mid"] + 0.01 for w in all_words)
-
-        bbox = {
-            "Left": left,
-            "Top": top,
-            "Width": right - left,
-            "Height": bottom - top
-        }
+        # Union bbox (small margin) in one vectorized pass
+        bbox = self._words_union_bbox(all_words)
 
         if debug:
             print(f"🔍 Universal fields bbox (rows + KV above table): {bbox}")
@@ -997,18 +1210,9 @@ class HandwrittenTableForm(BaseFormProcessor):
         if not all_words:
             return {}
 
-        # Calculate union of all word bounding boxes
-        left = min(w["x_mid"] - 0.01 for w in all_words)  # Add small margin
-        right = max(w["x_mid"] + 0.01 for w in all_words)
-        top = min(w["y_mid"] - 0.01 for w in all_words)
-        bottom = max(w["y_mid"] + 0.01 for w in all_words)
-
-        bbox = {
-            "Left": left,
-            "Top": top,
-            "Width": right - left,
-            "Height": bottom - top
-        }
+        # Union of all word midpoints (small margin), shared with
+        # _get_universal_fields_bbox
+        bbox = self._words_union_bbox(all_words)
 
         if debug:
             print(f"🔍 Header map bbox: {bbox}")
@@ -1016,7 +1220,10 @@ class HandwrittenTableForm(BaseFormProcessor):
         return bbox
 
     def _bboxes_overlap(self, bbox1: Dict[str, float], bbox2: Dict[str, float], threshold: float = 0.05) -> bool:
-        """Check if two bounding boxes overlap significantly."""
+        """Check if two bounding boxes overlap significantly.
+
+        For many-vs-many sweeps use _bboxes_overlap_batch on (N, 4) arrays.
+        """
         # Calculate overlap area
         left = max(bbox1["Left"], bbox2["Left"])
         right = min(bbox1["Left"] + bbox1["Width"],
@@ -1039,152 +1246,226 @@ class HandwrittenTableForm(BaseFormProcessor):
         return False
 
     def _bboxes_close(self, bbox1: Dict[str, float], bbox2: Dict[str, float], max_distance: float = 0.1) -> bool:
-        """Check if two bounding boxes are close enough to be in the same logical cell."""
-        # Calculate center points
-        center1_x = bbox1["Left"] + bbox1["Width"] / 2
-        center1_y = bbox1["Top"] + bbox1["Height"] / 2
-        center2_x = bbox2["Left"] + bbox2["Width"] / 2
-        center2_y = bbox2["Top"] + bbox2["Height"] / 2
+        """Check if two bounding boxes are close enough to be in the same logical cell.
 
-        # Calculate distance between centers
-        distance = ((center1_x - center2_x) ** 2 +
-                    (center1_y - center2_y) ** 2) ** 0.5
+        For many-vs-many sweeps use _bboxes_close_batch on (N, 4) arrays.
+        """
+        # Compare squared center distance against the squared threshold; the
+        # sqrt adds nothing to a boolean test (the batch kernels above do the
+        # same)
+        dx = (bbox1["Left"] + bbox1["Width"] / 2) - \
+            (bbox2["Left"] + bbox2["Width"] / 2)
+        dy = (bbox1["Top"] + bbox1["Height"] / 2) - \
+            (bbox2["Top"] + bbox2["Height"] / 2)
 
-        return distance < max_distance
+        return dx * dx + dy * dy < max_distance * max_distance
 
     def extract_rows_from_cells(self, textract_json: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract rows using CELL blocks with RowIndex, then get words from each cell."""
-        # First, build a map of all WORD blocks by ID
+        # Memoized per document the same way as _index_blocks (held
+        # document + "is" comparison): the classify and header-map passes
+        # both start from the same row extraction.
+        cached = getattr(self, "_rows_cache", None)
+        if cached is not None and cached[0] is textract_json:
+            return cached[1]
+
+        # Single pass over Blocks: build the WORD map and group CELL blocks by
+        # RowIndex in one traversal instead of scanning the block list twice.
+        # Accept either a parsed Textract document or a bare iterable of
+        # blocks (e.g. from iter_blocks) so callers can stream large files.
+        if hasattr(textract_json, "get"):
+            blocks = textract_json.get("Blocks", [])
+        else:
+            blocks = textract_json
+
+        # WORDs may be referenced by several cells through CHILD
+        # relationships, so derive the midpoints (and strip the text) exactly
+        # once here rather than every time a cell pulls the word in.
         word_map = {}
-        for block in textract_json.get("Blocks", []):
-            if block["BlockType"] == "WORD":
-                word_map[block["Id"]] = block
-
-        # Group CELL blocks by RowIndex
-        rows_by_index = {}
-        for block in textract_json.get("Blocks", []):
-            if block["BlockType"] != "CELL":
-                continue
-
-            row_index = block.get("RowIndex", 0)
-            if row_index not in rows_by_index:
-                rows_by_index[row_index] = []
-            rows_by_index[row_index].append(block)
-
-        # Convert to rows with words
+        cell_blocks = []
+        for block in blocks:
+            block_type = block["BlockType"]
+            if block_type == "WORD":
+                bb = block["Geometry"]["BoundingBox"]
+                # Interned so downstream == "HANDWRITING" checks hit the
+                # pointer-equality fast path (parsers return fresh strings)
+                text_type = sys.intern(block.get("TextType", "PRINTED"))
+                word_map[block["Id"]] = {
+                    "text": block.get("Text", "").strip(),
+                    "text_type": text_type,
+                    "tt_code": _TT_CODE.get(text_type, 0),
+                    "x_mid": bb["Left"] + bb["Width"] / 2,
+                    "y_mid": bb["Top"] + bb["Height"] / 2,
+                }
+            elif block_type == "CELL":
+                cell_blocks.append(block)
+
+        # Flatten every (row, cell, word) into one keyed list and sort it
+        # once: Timsort's C tuple comparison replaces the per-row cell sort
+        # plus the per-cell word sort. The key order (row, column, y, x)
+        # reproduces the old nested ordering exactly.
+        flat = []
+        for cell in cell_blocks:
+            row_index = cell.get("RowIndex", 0)
+            column_index = cell.get("ColumnIndex", 0)
+            # Flatten CHILD relationship ids and expand them in one pass
+            child_ids = chain.from_iterable(
+                rel["Ids"] for rel in cell.get("Relationships", ())
+                if rel["Type"] == "CHILD")
+            for word_id in child_ids:
+                word = word_map.get(word_id)
+                if word is not None:
+                    flat.append((row_index, column_index,
+                                 word["y_mid"], word["x_mid"], word))
+        flat.sort(key=itemgetter(0, 1, 2, 3))
+
+        # Convert to rows with words, grouping the sorted flat list by row
         rows = []
-        for row_index in sorted(rows_by_index.keys()):
-            cells = rows_by_index[row_index]
-            words = []
-
-            # Sort cells by ColumnIndex to maintain column order
-            cells.sort(key=lambda c: c.get("ColumnIndex", 0))
-
-            # Get words from each cell in this row, maintaining cell grouping
-            for cell in cells:
-                cell_words = []
-                for relationship in cell.get("Relationships", []):
-                    if relationship["Type"] == "CHILD":
-                        for word_id in relationship["Ids"]:
-                            if word_id in word_map:
-                                word_block = word_map[word_id]
-                                cell_words.append({
-                                    "text": word_block.get("Text", "").strip(),
-                                    "text_type": word_block.get("TextType", "PRINTED"),
-                                    "x_mid": word_block["Geometry"]["BoundingBox"]["Left"] + word_block["Geometry"]["BoundingBox"]["Width"] / 2,
-                                    "y_mid": word_block["Geometry"]["BoundingBox"]["Top"] + word_block["Geometry"]["BoundingBox"]["Height"] / 2,
-                                    "column_index": cell.get("ColumnIndex", 0),
-                                })
-
-                # Sort words within this cell by y-coordinate first, then x-coordinate
-                # This preserves multi-line sentences like "Soil Temperature in °C"
-                cell_words.sort(key=lambda w: (w["y_mid"], w["x_mid"]))
-                words.extend(cell_words)
+        for row_index, group in groupby(flat, key=itemgetter(0)):
+            words = [dict(word, column_index=column_index)
+                     for _, column_index, _, _, word in group]
 
             if words:  # Only add rows that have words
+                # Struct-of-arrays companions to the word dicts: the numeric
+                # fields the classifier reduces over, as contiguous arrays.
+                # type_codes covers non-empty words only (0=PRINTED,
+                # 1=HANDWRITING), matching what classification cares about.
+                y_mids = np.fromiter(
+                    (w["y_mid"] for w in words),
+                    dtype=np.float64, count=len(words))
+                type_codes = np.fromiter(
+                    (w["tt_code"] for w in words if w["text"]),
+                    dtype=np.uint8)
                 rows.append({
                     "row_index": row_index,
                     # Average Y position
-                    "y_mid": sum(w["y_mid"] for w in words) / len(words),
-                    "words": words
+                    "y_mid": float(y_mids.mean()),
+                    "words": words,
+                    "type_codes": type_codes,
                 })
 
+        self._rows_cache = (textract_json, rows)
         return rows
 
     def extract_words(self, textract_json: Dict[str, Any]) -> List[Dict[str, Any]]:
-        words = []
-        for b in textract_json.get("Blocks", []):
-            if b["BlockType"] != "WORD":
+        # Words with no usable text never make a record: the empty check runs
+        # on the raw string before any stripping or dict construction.
+        word_blocks = []
+        texts = []
+        for b in self._index_blocks(textract_json)["WORD"].values():
+            raw = b.get("Text")
+            if not raw or raw.isspace():
                 continue
+            word_blocks.append(b)
+            texts.append(raw.strip())
+        if not word_blocks:
+            return []
+
+        # Gather the bbox fields into one (n_words, 4) array and compute the
+        # midpoints with two vector ops; the y-sort becomes an argsort over
+        # a contiguous float array instead of a per-dict key extraction.
+        bboxes = np.empty((len(word_blocks), 4), dtype=np.float64)
+        for i, b in enumerate(word_blocks):
             bb = b["Geometry"]["BoundingBox"]
-            words.append({
-                "text": b.get("Text", "").strip(),
-                "text_type": b.get("TextType", "PRINTED"),
-                "y_mid": bb["Top"] + bb["Height"] / 2,
-                "x_mid": bb["Left"] + bb["Width"] / 2,
-            })
-        words.sort(key=lambda w: w["y_mid"])
-        return words
+            bboxes[i, 0] = bb["Left"]
+            bboxes[i, 1] = bb["Top"]
+            bboxes[i, 2] = bb["Width"]
+            bboxes[i, 3] = bb["Height"]
+        x_mid = bboxes[:, 0] + bboxes[:, 2] * 0.5
+        y_mid = bboxes[:, 1] + bboxes[:, 3] * 0.5
+
+        order = np.argsort(y_mid, kind="stable")
+        return [{
+            "text": texts[i],
+            "text_type": word_blocks[i].get("TextType", "PRINTED"),
+            "y_mid": float(y_mid[i]),
+            "x_mid": float(x_mid[i]),
+        } for i in order]
 
     def cluster_rows(self, words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Group words by proximity of their vertical centers."""
-        rows = []
+        if not words:
+            return []
         row_gap_threshold = 0.015
-        current_y, current_row = None, []
-
-        for w in words:
-            if current_y is None:
-                current_y, current_row = w["y_mid"], [w]
-                continue
-
-            if abs(w["y_mid"] - current_y) < row_gap_threshold:
-                current_row.append(w)
-                current_y = (current_y + w["y_mid"]) / 2
-            else:
-                rows.append({"y_mid": current_y, "words": current_row})
-                current_y, current_row = w["y_mid"], [w]
 
-        if current_row:
-            rows.append({"y_mid": current_y, "words": current_row})
-
-        # Sort words within each row by x-coordinate (left to right)
-        for row in rows:
-            row["words"].sort(key=lambda w: w["x_mid"])
+        # Vectorized gap-split: sort the midpoints once, then cut wherever
+        # consecutive values jump by the row gap. One C-level diff replaces
+        # the per-word running-average walk.
+        y = np.fromiter((w["y_mid"] for w in words),
+                        dtype=np.float64, count=len(words))
+        order = np.argsort(y, kind="stable")
+        ys = y[order]
+        splits = np.flatnonzero(np.diff(ys) >= row_gap_threshold) + 1
 
+        rows = []
+        for group in np.split(order, splits):
+            row_words = [words[i] for i in group]
+            # Sort words within each row by x-coordinate (left to right)
+            row_words.sort(key=itemgetter("x_mid"))
+            rows.append({
+                "y_mid": float(y[group].mean()),
+                "words": row_words,
+            })
         return rows
 
     def assign_row_types(self, rows: List[Dict[str, Any]]):
         """Bottom-up classification: DATA -> HEADER -> UNIVERSAL -> TITLE_LEGEND."""
-        # First, classify basic types
-        for row in rows:
-            types = [w["text_type"] for w in row["words"] if w["text"].strip()]
-            if not types:
-                row["basic_type"] = "EMPTY"
-            elif all(t == "HANDWRITING" for t in types):
-                row["basic_type"] = "HANDWRITING_ONLY"
-            elif all(t == "PRINTED" for t in types):
-                row["basic_type"] = "PRINTED_ONLY"
-            else:
-                row["basic_type"] = "MIXED"
-
-        # Bottom-up state machine
+        # First, classify basic types from the per-row type-code arrays.
+        # With numba, all rows are reduced in one parallel native-code pass
+        # over a CSR-packed array; otherwise a per-row bincount over
+        # contiguous uint8 does the same work.
+        if _classify_rows_kernel is not None and rows:
+            lengths = np.fromiter(
+                (row["type_codes"].size for row in rows),
+                dtype=np.int64, count=len(rows))
+            offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            flat_codes = np.concatenate([row["type_codes"] for row in rows])
+            out_codes = np.empty(len(rows), dtype=np.uint8)
+            out_printed = np.empty(len(rows), dtype=np.int64)
+            out_hand = np.empty(len(rows), dtype=np.int64)
+            _classify_rows_kernel(
+                flat_codes, offsets, out_codes, out_printed, out_hand)
+            for r, row in enumerate(rows):
+                row["bt_code"] = int(out_codes[r])
+                row["basic_type"] = _BASIC_TYPES[out_codes[r]]
+                row["printed_count"] = int(out_printed[r])
+                row["hand_count"] = int(out_hand[r])
+        else:
+            for row in rows:
+                counts = np.bincount(row["type_codes"], minlength=2)
+                printed_count = int(counts[0])
+                hand_count = int(counts[1])
+                # Branchless 2-bit label index, mirroring the JIT kernel
+                code = (hand_count > 0) * 2 + (printed_count > 0)
+                row["bt_code"] = code
+                row["basic_type"] = _BASIC_TYPES[code]
+                row["printed_count"] = printed_count
+                row["hand_count"] = hand_count
+
+        # Bottom-up state machine. TITLE_LEGEND is absorbing, so once it is
+        # reached every remaining (higher) row is bulk-labelled and the
+        # per-row dispatch is skipped.
         state = "DATA"  # Start from bottom looking for data rows
-        for row in reversed(rows):  # Process from bottom to top
-            # Count printed vs handwritten words for MIXED rows
-            printed_count = sum(
-                1 for w in row["words"] if w["text_type"] == "PRINTED" and w["text"].strip())
-            hand_count = sum(
-                1 for w in row["words"] if w["text_type"] == "HANDWRITING" and w["text"].strip())
+        for i in range(len(rows) - 1, -1, -1):  # Process from bottom to top
+            if state == "TITLE_LEGEND":
+                for remaining in rows[:i + 1]:
+                    remaining["row_type"] = "TITLE_LEGEND"
+                break
+            row = rows[i]
+            # Small-int basic-type code: the dispatch below compares ints
+            # instead of interned strings
+            bt = row["bt_code"]
 
             if state == "DATA":
-                if row["basic_type"] == "HANDWRITING_ONLY":
+                if bt == _BT_HAND:
                     row["row_type"] = "DATA"
-                elif row["basic_type"] == "PRINTED_ONLY":
+                elif bt == _BT_PRINTED:
                     row["row_type"] = "HEADER"
                     state = "HEADER"
-                elif row["basic_type"] == "MIXED":
+                elif bt == _BT_MIXED:
                     # If mostly printed, treat as header; if mostly handwritten, treat as data
-                    if printed_count > hand_count:
+                    if row["printed_count"] > row["hand_count"]:
                         row["row_type"] = "HEADER"
                         state = "HEADER"
                     else:
@@ -1193,11 +1474,11 @@ class HandwrittenTableForm(BaseFormProcessor):
                     row["row_type"] = "EMPTY"
 
             elif state == "HEADER":
-                if row["basic_type"] == "PRINTED_ONLY":
+                if bt == _BT_PRINTED:
                     row["row_type"] = "HEADER"
-                elif row["basic_type"] == "MIXED":
+                elif bt == _BT_MIXED:
                     # Check if this looks like universal fields (key: value pattern)
-                    text = " ".join(w["text"] for w in row["words"])
+                    text = " ".join(map(_get_text, row["words"]))
                     if ":" in text or "-" in text:
                         row["row_type"] = "UNIVERSAL"
                         state = "UNIVERSAL"
@@ -1207,17 +1488,14 @@ class HandwrittenTableForm(BaseFormProcessor):
                     row["row_type"] = "HEADER"
 
             elif state == "UNIVERSAL":
-                if row["basic_type"] == "MIXED":
+                if bt == _BT_MIXED:
                     row["row_type"] = "UNIVERSAL"
-                elif row["basic_type"] == "PRINTED_ONLY":
+                elif bt == _BT_PRINTED:
                     row["row_type"] = "TITLE_LEGEND"
                     state = "TITLE_LEGEND"
                 else:
                     row["row_type"] = "UNIVERSAL"
 
-            else:  # TITLE_LEGEND
-                row["row_type"] = "TITLE_LEGEND"
-
 
 def write_output_file(structured_output: Dict[str, Any], output_file: Path, debug: bool = False):
     """Write structured output to a single file."""
@@ -1225,15 +1503,45 @@ def write_output_file(structured_output: Dict[str, Any], output_file: Path, debu
     if debug:
         print(f"🔍 Writing output file: {output_file}")
 
-    # Write unified.json (complete structured output)
-    with open(output_file, 'w') as f:
-        json.dump(structured_output, f, indent=2)
+    # Write unified.json (complete structured output); save_json uses the
+    # orjson indent-2 fast path when available
+    save_json(structured_output, output_file)
     print(f"✅ Written classified output: {output_file}")
 
     if debug:
         print(f"🔍 Output file created: {output_file}")
 
 
+# ======================================================
+# Batch classification
+# ======================================================
+
+def _classify_one(input_path: str, debug: bool = False) -> str:
+    """Classify a single Textract file; module-level so it pickles for
+    worker processes."""
+    input_file = Path(input_path)
+    output_file = input_file.parent / f"{input_file.stem}_classified.json"
+
+    textract_data = load_json(input_path)
+    processor = HandwrittenTableForm()
+    structured_output = processor.classify_rows(textract_data, debug=debug)
+    write_output_file(structured_output, output_file, debug)
+    return str(output_file)
+
+
+def classify_many(paths: List[str], workers: int = None,
+                  debug: bool = False) -> List[str]:
+    """Classify several Textract files across worker processes.
+
+    Documents are independent, so this sidesteps the GIL with one process
+    per file up to `workers`. Returns the output paths in input order.
+    """
+    if len(paths) == 1:
+        return [_classify_one(paths[0], debug)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_classify_one, paths, repeat(debug)))
+
+
 # ======================================================
 # CLI Entrypoint
 # ======================================================
@@ -1242,14 +1550,30 @@ def main():
     parser = argparse.ArgumentParser(
         description="Classify Textract rows by PRINTED/HANDWRITING composition."
     )
-    parser.add_argument("--input", required=True,
+    parser.add_argument("--input",
                         help="Path to Textract JSON file.")
+    parser.add_argument("--inputs", nargs="+",
+                        help="Paths to several Textract JSON files; classified in parallel worker processes.")
+    parser.add_argument("--workers", type=int,
+                        help="Worker process count for --inputs. Defaults to the CPU count.")
     parser.add_argument("--output",
-                        help="Output file path. If not specified, uses input path stem + '_classified.json' suffix.")
+                        help="Output file path (single --input only). If not specified, uses input path stem + '_classified.json' suffix.")
     parser.add_argument("--debug", action="store_true",
                         help="Enable verbose debug output.")
     args = parser.parse_args()
 
+    if bool(args.input) == bool(args.inputs):
+        parser.error("Provide exactly one of --input or --inputs.")
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format="%(message)s")
+
+    if args.inputs:
+        for output_file in classify_many(args.inputs, args.workers, args.debug):
+            print(f"📁 Output file: {output_file}")
+        return
+
     # Determine output file
     if args.output:
         output_file = Path(args.output)
@@ -8,39 +8,29 @@ $ python3 ./top_down_preprocess.py --input 001_layout.json
 """
 #!/usr/bin/env python3
 
-import json
 import argparse
-import statistics
 import re
 from pathlib import Path
 from typing import List, Dict, Any, Tuple
 from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
 
-# IO utils
+import numpy as np
 
+from textract_utils import load_json, save_json, to_snake_case
 
-def load_json(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
-
-def save_json(data: Any, path: str) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+# Compiled once: detect_header_rows probes every cell text for a letter
+_ALPHA_RE = re.compile(r"[A-Za-z]")
 
 # Text utils
 
 
-def to_snake_case(text: str) -> str:
-    if not text:
-        return ""
-    text = text.strip().lower()
-    text = text.replace("#", " number ")
-    text = re.sub(r"[^a-z0-9]+", "_", text)
-    text = re.sub(r"_+", "_", text).strip("_")
-    return text
-
-
 def join_clean(parts: List[str]) -> str:
     parts = [p for p in parts if p and p.strip()]
     text = " ".join(parts)
@@ -73,11 +63,67 @@ def horizontal_gap(a: Dict[str, float], b: Dict[str, float]) -> float:
     # positive if b is to the right of a
     return b["x"] - (a["x"] + a["w"])
 
+
+def _lines_geometry(lines: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack line bboxes into an (L, 4) x/y/w/h array plus a confidence
+    array, so the stitching kernel runs over contiguous floats."""
+    boxes = np.empty((len(lines), 4), dtype=np.float64)
+    confs = np.empty(len(lines), dtype=np.float64)
+    for i, ln in enumerate(lines):
+        bb = ln["bbox"]
+        boxes[i, 0] = bb["x"]
+        boxes[i, 1] = bb["y"]
+        boxes[i, 2] = bb["w"]
+        boxes[i, 3] = bb["h"]
+        confs[i] = ln["confidence"]
+    return boxes, confs
+
+
+# Array form of the horizontal_gap/vertical_overlap acceptance test used by
+# stitch_header_fragments: with numba it compiles to a native loop, otherwise
+# it broadcasts in NumPy. Either way the per-line Python dispatch is gone.
+if njit is not None:
+    @njit(cache=True)
+    def _fragment_mask(cell_box, line_boxes, line_confs,
+                       max_right_dx, min_v_overlap):
+        n = line_boxes.shape[0]
+        out = np.zeros(n, dtype=np.bool_)
+        cell_right = cell_box[0] + cell_box[2]
+        cell_y1 = cell_box[1]
+        cell_y2 = cell_box[1] + cell_box[3]
+        for i in range(n):
+            if line_confs[i] < 85.0:
+                continue
+            gap = line_boxes[i, 0] - cell_right
+            if gap < 0.0 or gap > max_right_dx:
+                continue
+            inter = (min(cell_y2, line_boxes[i, 1] + line_boxes[i, 3])
+                     - max(cell_y1, line_boxes[i, 1]))
+            if inter < 0.0:
+                inter = 0.0
+            denom = max(cell_box[3], max(line_boxes[i, 3], 1e-6))
+            if inter / denom >= min_v_overlap:
+                out[i] = True
+        return out
+else:
+    def _fragment_mask(cell_box, line_boxes, line_confs,
+                       max_right_dx, min_v_overlap):
+        gap = line_boxes[:, 0] - (cell_box[0] + cell_box[2])
+        inter = (np.minimum(cell_box[1] + cell_box[3],
+                            line_boxes[:, 1] + line_boxes[:, 3])
+                 - np.maximum(cell_box[1], line_boxes[:, 1]))
+        denom = np.maximum(np.maximum(cell_box[3], line_boxes[:, 3]), 1e-6)
+        v_ov = np.clip(inter, 0.0, None) / denom
+        return ((line_confs >= 85.0) & (gap >= 0.0)
+                & (gap <= max_right_dx) & (v_ov >= min_v_overlap))
+
 # Textract extraction
 
 
 def extract_cells(textract_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     block_map = {b["Id"]: b for b in textract_data["Blocks"]}
+    # Bound lookup avoids re-resolving the method per child id in the loop
+    get_block = block_map.get
     cells: List[Dict[str, Any]] = []
     for block in textract_data["Blocks"]:
         if block["BlockType"] != "CELL":
@@ -87,11 +133,9 @@ def extract_cells(textract_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         if "Relationships" in block:
             for rel in block["Relationships"]:
                 if rel["Type"] == "CHILD":
-                    words = []
-                    for w_id in rel["Ids"]:
-                        w = block_map.get(w_id)
-                        if w and w["BlockType"] == "WORD":
-                            words.append(w.get("Text", ""))
+                    words = [
+                        w.get("Text", "") for w_id in rel["Ids"]
+                        if (w := get_block(w_id)) and w["BlockType"] == "WORD"]
                     text = " ".join(words).strip()
 
         bb = block["Geometry"]["BoundingBox"]
@@ -127,26 +171,41 @@ def extract_lines(textract_data: Dict[str, Any]) -> List[Dict[str, Any]]:
 
 
 def detect_header_rows(cells: List[Dict[str, Any]], header_row_density: float) -> List[int]:
-    row_cells = defaultdict(list)
-    for c in cells:
-        row_cells[c["row"]].append(c)
-
-    if not row_cells:
+    if not cells:
         return [1]
 
     total_cols = max((c["col"] + c["colspan"] - 1) for c in cells)
     header_rows: List[int] = []
 
-    for r in sorted(row_cells.keys()):
-        row = row_cells[r]
-        filled = sum(c["colspan"] for c in row if (c["text"] or "").strip())
+    # cells arrive sorted by (row, col) from extract_cells, so groupby walks
+    # the rows in order without the defaultdict or the sorted(keys) pass
+    for r, group in groupby(cells, key=itemgetter("row")):
+        row = list(group)
+        # One pass over the row's cells accumulates every statistic the
+        # header heuristic needs, instead of six separate reductions.
+        # sum/len averaging (not statistics.mean) keeps it plain float math.
+        filled = 0
+        conf_sum = 0.0
+        has_span = False
+        text_count = 0
+        alpha_count = 0
+        len_sum = 0
+        for c in row:
+            cs = c["colspan"]
+            if cs > 1:
+                has_span = True
+            conf_sum += c["confidence"]
+            t = c["text"] or ""
+            if t.strip():
+                filled += cs
+                text_count += 1
+                len_sum += len(t)
+                if _ALPHA_RE.search(t):
+                    alpha_count += 1
         density = filled / max(1, total_cols)
-        avg_conf = statistics.mean(c["confidence"] for c in row)
-        has_span = any(c["colspan"] > 1 for c in row)
-        texts = [c["text"] for c in row if (c["text"] or "").strip()]
-        alpha_ratio = (sum(1 for t in texts if re.search(
-            r"[A-Za-z]", t)) / (len(texts) or 1))
-        avg_len = statistics.mean(len(t) for t in texts) if texts else 0
+        avg_conf = conf_sum / len(row)
+        alpha_ratio = alpha_count / (text_count or 1)
+        avg_len = len_sum / text_count if text_count else 0
         text_rich = (alpha_ratio > 0.5 or avg_len > 3)
 
         if has_span or (avg_conf >= 85 and (density >= header_row_density or text_rich)):
@@ -163,20 +222,25 @@ def detect_header_rows(cells: List[Dict[str, Any]], header_row_density: float) -
 
 
 def stitch_header_fragments(leaf_cell: Dict[str, Any], all_lines: List[Dict[str, Any]],
-                            max_right_dx: float, min_v_overlap: float) -> str:
+                            max_right_dx: float, min_v_overlap: float,
+                            line_boxes: np.ndarray = None,
+                            line_confs: np.ndarray = None) -> str:
     base = (leaf_cell["text"] or "").strip()
     if not base or len(base) > 6:
         return base  # only attempt to stitch very short bases like "Soil"
 
+    # Callers looping over many cells pass the packed line arrays in once;
+    # the kernel applies the right-of/close-by/overlapping test to all lines
+    if line_boxes is None:
+        line_boxes, line_confs = _lines_geometry(all_lines)
     b = leaf_cell["bbox"]
+    cell_box = np.array([b["x"], b["y"], b["w"], b["h"]], dtype=np.float64)
+    mask = _fragment_mask(
+        cell_box, line_boxes, line_confs, max_right_dx, min_v_overlap)
+
     fragments = [base]
-    for ln in all_lines:
-        if ln["confidence"] < 85:
-            continue
-        # accept lines horizontally to the right, close by
-        if 0.0 <= horizontal_gap(b, ln["bbox"]) <= max_right_dx:
-            if vertical_overlap(b, ln["bbox"]) >= min_v_overlap:
-                fragments.append(ln["text"])
+    for i in np.flatnonzero(mask):
+        fragments.append(all_lines[i]["text"])
     return join_clean(fragments)
 
 # Header map (with floating parents)
@@ -212,16 +276,33 @@ def build_header_map(cells: List[Dict[str, Any]],
     leaf_cells = sorted(row_cells[leaf_row], key=lambda c: c["col"])
     total_cols = max(c["col"] for c in cells)
 
+    # Leaf-cell geometry in one (N, 4) x/y/w/h array: the band position,
+    # average extents and column centers below all come out of vectorized
+    # reductions over it instead of separate statistics.mean/min passes
+    if leaf_cells:
+        leaf_arr = np.array(
+            [[c["bbox"]["x"], c["bbox"]["y"], c["bbox"]["w"], c["bbox"]["h"]]
+             for c in leaf_cells], dtype=np.float64)
+        leaf_top = float(leaf_arr[:, 1].min())
+        avg_leaf_w = float(leaf_arr[:, 2].mean())
+        leaf_h = float(leaf_arr[:, 3].mean())
+        leaf_centers = leaf_arr[:, 0] + leaf_arr[:, 2] * 0.5
+    else:
+        leaf_top, avg_leaf_w, leaf_h = 0.0, 0.05, 0.02
+        leaf_centers = np.empty(0, dtype=np.float64)
+
     # First pass: use cell text, with stitching for tiny bases
     leaf_texts: Dict[int, str] = {}
-    # estimate a reasonable dx to the right (page-space) and vertical overlap
-    avg_leaf_h = statistics.mean(c["bbox"]["h"]
-                                 for c in leaf_cells) if leaf_cells else 0.02
     dx = 0.08  # generous page-relative tolerance to catch "Temper" "ature in"
+    line_boxes, line_confs = _lines_geometry(lines)
     for c in leaf_cells:
         stitched = stitch_header_fragments(
-            c, lines, max_right_dx=dx, min_v_overlap=0.5)
+            c, lines, max_right_dx=dx, min_v_overlap=0.5,
+            line_boxes=line_boxes, line_confs=line_confs)
         leaf_texts[c["col"]] = stitched
+    # Snake-cased leaf texts, computed once; the floating-parent loop below
+    # may revisit the same column for several candidate lines
+    snake_leaf = {col: to_snake_case(t) for col, t in leaf_texts.items()}
 
     # Parent from CELL spans (if any)
     top_headers = []
@@ -242,13 +323,12 @@ def build_header_map(cells: List[Dict[str, Any]],
         header_map[c["col"]] = name
 
     # ---- Floating parent via LINEs (e.g., "Canopy Openness") ----
-    # Build column centers for the leaf row
-    col_centers: Dict[int, float] = {
-        c["col"]: bbox_center_x(c["bbox"]) for c in leaf_cells}
-    # Leaf band vertical position
-    leaf_top = min(c["bbox"]["y"] for c in leaf_cells) if leaf_cells else 0.0
-    leaf_h = statistics.mean(c["bbox"]["h"]
-                             for c in leaf_cells) if leaf_cells else 0.02
+    # Column centers for the leaf row, sorted by center x: each candidate
+    # line's coverage query below becomes two binary searches over the
+    # center array instead of a scan of every column
+    center_sort = np.argsort(leaf_centers)
+    cx_arr = leaf_centers[center_sort]
+    center_cols = [leaf_cells[i]["col"] for i in center_sort]
 
     # Candidate lines: close above the leaf band
     parent_candidates: List[Dict[str, Any]] = []
@@ -261,23 +341,19 @@ def build_header_map(cells: List[Dict[str, Any]],
 
     # For each candidate, see how many leaf columns it spans horizontally
     # Allow a small x padding around the line bbox
-    if leaf_cells:
-        avg_leaf_w = statistics.mean(c["bbox"]["w"] for c in leaf_cells)
-    else:
-        avg_leaf_w = 0.05
     x_pad = max(0.015, 0.6 * avg_leaf_w)
 
     for ln in parent_candidates:
         L = ln["bbox"]["x"] - x_pad
         R = bbox_right(ln["bbox"]) + x_pad
-        covered_cols = [col for col, cx in col_centers.items() if L <= cx <= R]
+        lo = np.searchsorted(cx_arr, L)
+        hi = np.searchsorted(cx_arr, R, side="right")
+        covered_cols = center_cols[lo:hi]
         if len(covered_cols) >= 2:
             parent_key = to_snake_case(ln["text"])
             for col in covered_cols:
-                leaf_key = header_map.get(col) or to_snake_case(
-                    leaf_texts.get(col, ""))
-                if not leaf_key:
-                    leaf_key = f"col_{col}"
+                leaf_key = (header_map.get(col) or snake_leaf.get(col)
+                            or f"col_{col}")
                 if not leaf_key.startswith(parent_key + "_"):
                     header_map[col] = f"{parent_key}_{leaf_key}"
 
@@ -285,12 +361,15 @@ def build_header_map(cells: List[Dict[str, Any]],
     for i in range(1, total_cols + 1):
         if i not in header_map:
             header_map[i] = f"col_{i}"
-    seen = {}
-    for k, v in list(header_map.items()):
+    # Dedupe with a set over sorted column keys: deterministic (lowest
+    # column keeps the bare name) and no items() snapshot copy
+    seen: set = set()
+    for k in sorted(header_map):
+        v = header_map[k]
         if v in seen:
             header_map[k] = f"{v}_{k}"
         else:
-            seen[v] = True
+            seen.add(v)
 
     return header_map
 
@@ -303,17 +382,16 @@ def build_rows_and_boxes(
     header_rows: List[int],
     confidence_threshold: float
 ) -> Tuple[List[Dict[str, str]], List[Dict[str, Any]]]:
-    data_rows = defaultdict(list)
-    for c in cells:
-        if c["row"] not in header_rows:
-            data_rows[c["row"]].append(c)
-
     structured_rows = []
     overlay_boxes = []
 
-    for row_idx in sorted(data_rows.keys()):
+    # cells are already (row, col)-sorted, so grouping by row preserves both
+    # the row order and the per-row column order with no dict or re-sort
+    for row_idx, group in groupby(cells, key=itemgetter("row")):
+        if row_idx in header_rows:
+            continue
         row_obj: Dict[str, str] = {}
-        for cell in sorted(data_rows[row_idx], key=lambda z: z["col"]):
+        for cell in group:
             key = header_map.get(cell["col"], f"col_{cell['col']}")
             value = cell["text"]
             row_obj[key] = value
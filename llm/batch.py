@@ -0,0 +1,74 @@
+"""
+Submit extract requests through the OpenAI Batch API.
+
+Batched requests are billed at half the token price and run with a 24h
+completion window, which suits the extract step: results land in db.json
+asynchronously anyway, so nothing user-facing waits on them.
+"""
+
+import json
+import time
+from pathlib import Path
+
+from client import _shim_response
+
+
+def submit_batch(openai_client, requests, batch_dir="."):
+    """Write the requests JSONL, upload it and create the batch.
+
+    @param openai_client: A sync OpenAI SDK client.
+    @param requests: List of (custom_id, params) pairs, where params is the
+        chat.completions request body.
+
+    @return: The batch id to poll with wait_for_batch.
+    """
+    lines = [
+        json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": params,
+        })
+        for custom_id, params in requests]
+    jsonl_path = Path(batch_dir) / f"batch_{int(time.time())}.jsonl"
+    jsonl_path.write_text("\n".join(lines) + "\n")
+
+    with jsonl_path.open("rb") as f:
+        batch_file = openai_client.files.create(file=f, purpose="batch")
+    batch = openai_client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def wait_for_batch(openai_client, batch_id, poll_interval=30.0,
+                   max_interval=600.0):
+    """Poll the batch with exponential backoff until it completes.
+
+    @return: Dict of custom_id -> response object (shimmed to look like a
+        chat.completions response, so the *Response classes consume it
+        unchanged).
+    """
+    interval = poll_interval
+    while True:
+        batch = openai_client.batches.retrieve(batch_id)
+        if batch.status == "completed":
+            break
+        if batch.status in ("failed", "expired", "cancelled"):
+            raise RuntimeError(
+                f"Batch {batch_id} ended with status {batch.status}")
+        print(f"Batch {batch_id} status: {batch.status}, "
+              f"retrying in {interval:.0f}s")
+        time.sleep(interval)
+        interval = min(interval * 2, max_interval)
+
+    output = openai_client.files.content(batch.output_file_id).text
+    results = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        results[item["custom_id"]] = _shim_response(item["response"]["body"])
+    return results
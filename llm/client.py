@@ -1,41 +1,190 @@
+import hashlib
 import json
-from openai import OpenAI
+import time
+import httpx
+from openai import OpenAI, AsyncOpenAI
 from pathlib import Path
+from types import SimpleNamespace
+
+from response import url_filename
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Cache keys only need collision resistance, not cryptographic strength;
+# blake3/xxhash digest the multi-KB request bodies several times faster
+# than sha256. All three expose the same hexdigest() API.
+try:
+    from blake3 import blake3 as _digest
+except ImportError:
+    try:
+        from xxhash import xxh3_128 as _digest
+    except ImportError:
+        _digest = hashlib.sha256
+
+_OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+
+
+def _tuned_http_client():
+    """httpx AsyncClient sized for high fan-out.
+
+    The SDK default keeps far fewer keepalive connections than the
+    pipeline's concurrency, so bursts pay connection setup repeatedly.
+    HTTP/2 multiplexing is used when the optional h2 package is installed.
+    """
+    limits = httpx.Limits(max_connections=100,
+                          max_keepalive_connections=100,
+                          keepalive_expiry=30)
+    timeout = httpx.Timeout(600.0, connect=10.0)
+    try:
+        return httpx.AsyncClient(http2=True, limits=limits, timeout=timeout)
+    except ImportError:
+        # h2 not installed; plain HTTP/1.1 with the tuned pool
+        return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+def _shim_response(payload):
+    """Wrap a raw /v1/chat/completions payload dict so it exposes the same
+    attributes the SDK response objects do (.usage token counts and
+    .choices[0].message.content), keeping the *Response classes unchanged."""
+    usage = payload.get("usage") or {}
+    return SimpleNamespace(
+        usage=SimpleNamespace(
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            total_tokens=usage.get("total_tokens", 0)),
+        choices=[
+            SimpleNamespace(message=SimpleNamespace(
+                content=choice["message"]["content"]))
+            for choice in payload.get("choices", [])])
+
+
+class ResponseCache:
+    """Exact-match disk cache for chat.completions calls.
+
+    One JSON file per key under cache_dir; the key is a digest (blake3,
+    xxh3_128 or sha256, whichever import above won) of the full canonical
+    request body, so any change to model, prompt text or image URLs misses.
+    Hits skip the API round-trip (and its token bill) entirely, which
+    matters most on dev re-runs over the same images. Entries expire after
+    ttl seconds. Responses are cached before the *Response classes parse
+    them, so a malformed or truncated reply is replayed (and re-raises)
+    for the full ttl - clear the entry or the cache_dir to retry it.
+    """
+
+    def __init__(self, cache_dir=".llm_cache", ttl=86400):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+    @staticmethod
+    def key(params):
+        payload = json.dumps(params, sort_keys=True).encode()
+        return _digest(payload).hexdigest()
+
+    def get(self, key):
+        """Return the cached record for key, or None on miss/expiry."""
+        path = self.cache_dir / f"{key}.json"
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            return json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def set(self, key, response):
+        """Store the parts of a response the pipeline reads back."""
+        record = {
+            "choices": [
+                {"message": {"content": choice.message.content}}
+                for choice in response.choices]
+        }
+        (self.cache_dir / f"{key}.json").write_text(json.dumps(record))
 
 
 class ModelClient:
-    def __init__(self, api_key, model="gpt-5-mini"):
+    def __init__(self, api_key, model="gpt-5-mini", use_aiohttp=True,
+                 cache_dir=".llm_cache"):
         # Vision-capable model, other options: gpt-5 and gpt-5-mini and
         # gpt-4.1-mini, gpt-4.1 - but note that there is a 3-5x
         # difference in cost between the mini and non-mini models
         self.model = model
+        self.api_key = api_key
         self.client = OpenAI(api_key=api_key)
+        # Async twin of the sync client, used by infer_async for concurrent
+        # fan-out over many images (the round-trip is network-bound, so
+        # overlapping requests is a near-linear win). Created lazily and
+        # torn down in aclose(): its httpx pool binds to the running event
+        # loop, and main.py runs one asyncio.run loop per phase.
+        self._aclient = None
+        # The SDK's httpx AsyncClient throttles at high fan-out; when aiohttp
+        # is available, infer_async posts to the API directly over one shared
+        # connection pool instead.
+        self.use_aiohttp = use_aiohttp and aiohttp is not None
+        self._session = None
+        # Response cache; pass cache_dir=None to always hit the API. Cache
+        # hits come back with zeroed usage so cost attribution stays honest.
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        # url -> filename, so repeat calls over the same URLs skip the
+        # urlparse/path work
+        self._filename_cache = {}
         print(f"Using model: {self.model}")
 
-    def infer(self, prompt, image_urls):
-        """Run inference with given prompt and one or many images.
+    @property
+    def aclient(self):
+        """The AsyncOpenAI client for the current event loop."""
+        if self._aclient is None:
+            self._aclient = AsyncOpenAI(api_key=self.api_key,
+                                        http_client=_tuned_http_client())
+        return self._aclient
 
-        If there are more than one image in this list, it is assumed that the prompt in question knowns how to phrase the questions accoutning for this. Eitherways, this method makes exactly one call to the API.
+    @staticmethod
+    def filename_for_url(url):
+        """Filename part of a URL or path (query strings stripped).
 
-        @param prompt: Prompt object with .system() and .user() methods.
-        @param image_urls: List of URLs. 
-
-        @return: List of raw OpenAI API responses (one per image in non-batch 
-            mode, one response for all images in batch mode - but still wrapped 
-            in a list).
+        Delegates to response.url_filename so the source_file stub and the
+        response-side lookup key can never drift apart again.
         """
-        if not isinstance(image_urls, list):
-            image_urls = [image_urls]
+        return url_filename(url)
+
+    @classmethod
+    def validate_urls(cls, urls):
+        """Raise if two URLs share a filename.
 
-        content = [{"type": "text", "text": prompt.user()}]
+        The pipeline maps responses back to images by the echoed
+        source_file stub, so filenames must be unique across a run. Called
+        once up front rather than on every request build.
+        """
         unique_file_names = set()
-        for url in image_urls:
-            # Extract filename from URL or path
-            filename = Path(url).name
+        for url in urls:
+            filename = cls.filename_for_url(url)
             if filename in unique_file_names:
                 raise ValueError(
-                    f"Duplicate filename found: {filename} in {image_urls}")
+                    f"Duplicate filename found: {filename} in {urls}")
             unique_file_names.add(filename)
+
+    def _filename(self, url):
+        """Cached filename_for_url."""
+        filename = self._filename_cache.get(url)
+        if filename is None:
+            filename = self._filename_cache[url] = self.filename_for_url(url)
+        return filename
+
+    def _build_params(self, prompt, image_urls):
+        """Build the chat.completions request body shared by infer and
+        infer_async."""
+        if not isinstance(image_urls, list):
+            image_urls = [image_urls]
+
+        # One text block per user part: prompts that split a static prefix
+        # from their dynamic tail keep the prefix byte-identical across
+        # calls, which is what the API's automatic prompt caching keys on
+        content = [{"type": "text", "text": part}
+                   for part in prompt.user_parts()]
+        for url in image_urls:
+            filename = self._filename(url)
             # Add the text stub so the model can echo it back
             content.append(
                 {"type": "text", "text": f"source_file: {filename}"})
@@ -54,6 +203,98 @@ class ModelClient:
         if "gpt-4" in self.model:
             params["temperature"] = 0.0
 
+        # Per-step completion cap and response format come from the prompt
+        # class, not the client, since they track what each step's parser
+        # expects back. Same family split as the temperature gate above:
+        # gpt-4 models take max_tokens, while the gpt-5/o-series endpoint
+        # rejects it and wants max_completion_tokens (whose budget also
+        # covers reasoning tokens).
+        if prompt.MAX_TOKENS is not None:
+            if "gpt-4" in self.model:
+                params["max_tokens"] = prompt.MAX_TOKENS
+            else:
+                params["max_completion_tokens"] = prompt.MAX_TOKENS
+        if prompt.RESPONSE_FORMAT is not None:
+            params["response_format"] = prompt.RESPONSE_FORMAT
+
+        return params
+
+    def infer(self, prompt, image_urls):
+        """Run inference with given prompt and one or many images.
+
+        If there are more than one image in this list, it is assumed that the prompt in question knowns how to phrase the questions accoutning for this. Eitherways, this method makes exactly one call to the API.
+
+        @param prompt: Prompt object with .system() and .user() methods.
+        @param image_urls: List of URLs.
+
+        @return: List of raw OpenAI API responses (one per image in non-batch
+            mode, one response for all images in batch mode - but still wrapped
+            in a list).
+        """
+        params = self._build_params(prompt, image_urls)
+        if self.cache is not None:
+            key = ResponseCache.key(params)
+            record = self.cache.get(key)
+            if record is not None:
+                # usage is absent from the record, so the shim reports zero
+                # tokens for the free replay
+                return _shim_response(record)
         response = self.client.chat.completions.create(**params)
+        if self.cache is not None:
+            self.cache.set(key, response)
         # Return the raw OpenAI API response directly
         return response
+
+    async def infer_async(self, prompt, image_urls, semaphore=None):
+        """Async form of infer, for fanning out many images concurrently.
+
+        @param semaphore: Optional asyncio.Semaphore bounding in-flight
+            requests (respects API rate limits when gathering many tasks).
+        """
+        params = self._build_params(prompt, image_urls)
+        if semaphore is None:
+            return await self._dispatch_async(params)
+        async with semaphore:
+            return await self._dispatch_async(params)
+
+    async def _dispatch_async(self, params):
+        """Send one chat.completions request on the fastest available
+        transport: the shared aiohttp session when enabled, the SDK client
+        otherwise."""
+        if self.cache is not None:
+            key = ResponseCache.key(params)
+            record = self.cache.get(key)
+            if record is not None:
+                return _shim_response(record)
+        if self.use_aiohttp:
+            if self._session is None:
+                self._session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(
+                        limit=100, ttl_dns_cache=300),
+                    headers={"Authorization": f"Bearer {self.api_key}"})
+            async with self._session.post(
+                    _OPENAI_CHAT_URL, json=params) as resp:
+                resp.raise_for_status()
+                response = _shim_response(await resp.json())
+        else:
+            response = await self.aclient.chat.completions.create(**params)
+        if self.cache is not None:
+            self.cache.set(key, response)
+        return response
+
+    async def aclose(self):
+        """Close the per-loop async transports; call once per event loop
+        after the last infer_async has resolved.
+
+        Both the aiohttp session and the AsyncOpenAI client's httpx pool
+        are bound to the loop they first ran on; leaving either open across
+        main.py's per-phase asyncio.run calls raises "Event loop is
+        closed" when the next phase reuses them. Each is recreated lazily
+        on the next loop.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._aclient is not None:
+            await self._aclient.close()
+            self._aclient = None
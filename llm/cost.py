@@ -1,3 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class Pricing:
+    """Per-1M-token prices in USD for one model."""
+    input: float
+    output: float
+
 
 class CostCalculator:
     """Calculate OpenAI API costs based on model and usage."""
@@ -5,14 +14,19 @@ class CostCalculator:
     def __init__(self):
         # Pricing (per 1M tokens) from OpenAI docs (as of 2025-01)
         self.pricing = {
-            "gpt-4.1": {"input": 2.00, "output": 8.00},      # $2.00 / $8.00
-            "gpt-4.1-mini": {"input": 0.40, "output": 1.60},  # $0.40 / $1.60
-            "gpt-5-mini": {"input": 0.25, "output": 2.00},   # $0.25 / $2.00
-            "gpt-5": {"input": 1.25, "output": 10.00},      # $1.25 / $10.00
+            "gpt-4.1": Pricing(2.00, 8.00),           # $2.00 / $8.00
+            "gpt-4.1-mini": Pricing(0.40, 1.60),      # $0.40 / $1.60
+            "gpt-5-mini": Pricing(0.25, 2.00),        # $0.25 / $2.00
+            "gpt-5": Pricing(1.25, 10.00),            # $1.25 / $10.00
             # $1.25 / $10.00
-            "gpt-5-chat-latest": {"input": 1.25, "output": 10.00},
-            "gpt-5-codex": {"input": 1.25, "output": 10.00},  # $1.25 / $10.00
+            "gpt-5-chat-latest": Pricing(1.25, 10.00),
+            "gpt-5-codex": Pricing(1.25, 10.00),      # $1.25 / $10.00
         }
+        # Pre-scaled per-token rates: compute_cost does a single dict lookup
+        # and two multiplies instead of re-indexing pricing fields per call
+        self._per_token = {
+            model: (p.input / 1_000_000, p.output / 1_000_000)
+            for model, p in self.pricing.items()}
 
     def compute_cost(self, usage, model):
         """
@@ -24,17 +38,13 @@ class CostCalculator:
 
         @return: Cost in USD.
         """
-        if model not in self.pricing:
+        per_token = self._per_token.get(model)
+        if per_token is None:
             raise ValueError(f"Unknown model {model}, add pricing to lookup.")
 
-        prompt_tokens = usage.get("prompt_tokens", 0)
-        completion_tokens = usage.get("completion_tokens", 0)
-
-        cost_input = prompt_tokens * self.pricing[model]["input"]
-        cost_output = completion_tokens * self.pricing[model]["output"]
-
-        # Prices are per 1M tokens, so scale down
-        total_cost = (cost_input + cost_output) / 1_000_000
+        input_rate, output_rate = per_token
+        total_cost = (usage.get("prompt_tokens", 0) * input_rate
+                      + usage.get("completion_tokens", 0) * output_rate)
         return round(total_cost, 6)
 
     def print_cost(self, step_name, usage, model):
@@ -0,0 +1,32 @@
+"""Single .env parser shared by the CLI and the hack/ scripts.
+
+main.py and hack/run_prompt.py each grew their own copy and they had
+drifted: main.py's never stripped quotes, so a quoted
+OPEN_AI_API_KEY="sk-..." silently failed auth.
+"""
+
+import os
+
+try:
+    # python-dotenv handles quoting, escapes and inline comments; the
+    # fallback below covers the simple KEY=VALUE files this repo uses
+    from dotenv import dotenv_values
+except ImportError:
+    dotenv_values = None
+
+
+def load_env_file(env_path):
+    """Load environment variables from a .env file into a dict."""
+    if dotenv_values is not None:
+        return {key: value for key, value in dotenv_values(env_path).items()
+                if value is not None}
+
+    env_vars = {}
+    if os.path.exists(env_path):
+        with open(env_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#") and "=" in line:
+                    key, value = line.split("=", 1)
+                    env_vars[key.strip()] = value.strip().strip('"').strip("'")
+    return env_vars
@@ -1,10 +1,15 @@
 #!/usr/bin/env python3
 import argparse
 import json
-import os
 import subprocess
+import sys
 from pathlib import Path
 
+# Shared cost table and .env parser live one level up, next to main.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cost import CostCalculator
+from env import load_env_file
+
 # 🔹 Global list of image URLs
 IMAGE_URLS = [
     "https://fomomonguest.s3.ap-south-1.amazonaws.com/keystone/IMG-20250924-WA0000.jpg",
@@ -13,55 +18,6 @@ IMAGE_URLS = [
 ]
 
 
-def compute_cost(response, model):
-    """
-    Compute the cost of an OpenAI API call given the API response JSON
-    and the model name.
-
-    Args:
-        response (dict): Full API response as dict (parsed JSON).
-        model (str): The model string, e.g. "gpt-4.1", "gpt-4.1-mini", "gpt-5-mini".
-
-    Returns:
-        float: Cost in USD.
-    """
-
-    # Pricing (per 1M tokens) from OpenAI docs (as of 2025-01)
-    pricing = {
-        "gpt-4.1": {"input": 0.002, "output": 0.008},      # $2.00 / $8.00
-        "gpt-4.1-mini": {"input": 0.0004, "output": 0.0016},  # $0.40 / $1.60
-        "gpt-5-mini": {"input": 0.00025, "output": 0.002},   # $0.25 / $2.00
-        "gpt-5": {"input": 0.00125, "output": 0.01},         # $1.25 / $10.00
-    }
-
-    if model not in pricing:
-        raise ValueError(f"Unknown model {model}, add pricing to lookup.")
-
-    usage = response.get("usage", {})
-    prompt_tokens = usage.get("prompt_tokens", 0)
-    completion_tokens = usage.get("completion_tokens", 0)
-
-    cost_input = prompt_tokens * pricing[model]["input"]
-    cost_output = completion_tokens * pricing[model]["output"]
-
-    # Prices are per 1M tokens, so scale down
-    total_cost = (cost_input + cost_output) / 1_000_000
-    return round(total_cost, 6)
-
-
-def load_env(env_file):
-    """Load env vars from a .env file."""
-    env_vars = {}
-    with open(env_file, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            key, value = line.split("=", 1)
-            env_vars[key.strip()] = value.strip().strip('"').strip("'")
-    return env_vars
-
-
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--model", required=True,
@@ -78,7 +34,7 @@ def main():
     args = parser.parse_args()
 
     # Load env
-    env_vars = load_env(args.env_file)
+    env_vars = load_env_file(args.env_file)
     api_key = env_vars.get("OPEN_AI_API_KEY")
     if not api_key:
         raise RuntimeError("OPEN_AI_API_KEY not found in env file")
@@ -124,7 +80,7 @@ def main():
         print("stderr:", result.stderr)
 
     resp = json.loads(result.stdout)
-    cost = compute_cost(resp, args.model)
+    cost = CostCalculator().compute_cost(resp.get("usage", {}), args.model)
     print(f"Cost: ${cost}")
 
     try:
@@ -19,45 +19,164 @@ python main.py --images https://example.com/form.jpg --identify --debug
 
 #!/usr/bin/env python3
 import argparse
+import asyncio
 import json
 import hashlib
-import os
 from pathlib import Path
 import pprint
 
+from batch import submit_batch, wait_for_batch
 from client import ModelClient
+from env import load_env_file
 from registry import FormRegistry
 from response import IdentifyResponse, ClassifyResponse, ExtractResponse
 from prompt import IdentifyPrompt, ClassifyPrompt, ExtractPrompt
 from cost import CostCalculator
 
+try:
+    # Faster JSON for the larger on-disk blobs (species dict, db.json);
+    # format on disk is unchanged
+    import orjson
+except ImportError:
+    orjson = None
+
+# Cap on concurrent in-flight API requests when fanning out identify/extract
+# calls; keeps the pipeline under OpenAI rate limits.
+MAX_CONCURRENT_REQUESTS = 20
+
+# Images per classify request. One giant multi-image call risks per-request
+# limits and blocks on the slowest token; chunks this size run concurrently.
+CLASSIFY_CHUNK_SIZE = 8
+
 
 def load_species_names(species_dict_path):
     """Load species_dict.json and return sorted list of abbr+toda names."""
-    with open(species_dict_path, "r", encoding="utf-8") as f:
-        species_dict = json.load(f)
-    names = set()
-    for entry in species_dict:
-        abbr = entry.get("abbr")
-        toda_name = entry.get("toda_name")
-        if abbr and abbr.strip().lower() != "na":
-            names.add(abbr.strip())
-        if toda_name and toda_name.strip().lower() != "na":
-            names.add(toda_name.strip())
+    with open(species_dict_path, "rb") as f:
+        raw = f.read()
+    species_dict = orjson.loads(raw) if orjson else json.loads(raw)
+    # One pass over both name fields; "na" marks a missing name
+    names = {
+        name.strip()
+        for entry in species_dict
+        for name in (entry.get("abbr"), entry.get("toda_name"))
+        if name and name.strip().lower() != "na"
+    }
     return sorted(names)
 
 
-def load_env_file(env_path):
-    """Load environment variables from .env file."""
-    env_vars = {}
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    env_vars[key.strip()] = value.strip()
-    return env_vars
+async def _pipeline_identify_classify(client, identify_prompt, classify_prompt,
+                                      urls_to_identify, ready_to_classify,
+                                      on_identified):
+    """Overlap the identify and classify stages in one event loop.
+
+    Identify tasks fan out under a shared semaphore and feed a queue; the
+    classify stage fires a chunk request as soon as CLASSIFY_CHUNK_SIZE
+    URLs are ready, so classification of early images overlaps
+    identification of later ones instead of waiting on the whole batch.
+
+    @param ready_to_classify: URLs that already have hashes and can be
+        chunked immediately.
+    @param on_identified: Callback(url, raw_response) -> bool; records the
+        hash and returns whether the URL still needs classification.
+
+    @return: List of raw classify responses, one per chunk.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    queue = asyncio.Queue()
+    classify_raws = []
+
+    async def identify_one(url):
+        raw = await client.infer_async(identify_prompt, url, semaphore)
+        # A None item keeps the stage's item count exact when the URL
+        # turns out to be classified already
+        await queue.put(url if on_identified(url, raw) else None)
+
+    async def classify_chunk(chunk):
+        classify_raws.append(
+            await client.infer_async(classify_prompt, chunk, semaphore))
+
+    async def classify_stage(tg):
+        pending = list(ready_to_classify)
+        remaining = len(urls_to_identify)
+        while True:
+            while len(pending) >= CLASSIFY_CHUNK_SIZE:
+                tg.create_task(classify_chunk(pending[:CLASSIFY_CHUNK_SIZE]))
+                pending = pending[CLASSIFY_CHUNK_SIZE:]
+            if not remaining:
+                break
+            url = await queue.get()
+            remaining -= 1
+            if url is not None:
+                pending.append(url)
+        if pending:
+            tg.create_task(classify_chunk(pending))
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for url in urls_to_identify:
+                tg.create_task(identify_one(url))
+            tg.create_task(classify_stage(tg))
+    finally:
+        # The aiohttp session is bound to this event loop
+        await client.aclose()
+    return classify_raws
+
+
+def record_classifications(registry, classify_responses, urls, debug):
+    """Map classify responses back to URLs via the echoed source_file and
+    store each form template + instruction in the registry."""
+    for image_url in urls:
+        # Get hash for this URL
+        hash = registry.get_hash_for_url(image_url)
+
+        # Get form template and instruction for this specific URL,
+        # checking each chunk's response until the URL is found
+        form = None
+        form_instruction = None
+        for classify_response in classify_responses:
+            form = classify_response.get_form_by_url(image_url)
+            if form:
+                form_instruction = (
+                    classify_response.get_form_instruction_by_url(
+                        image_url))
+                break
+        if debug:
+            print(f"CLASSIFY[{image_url}]: {form}")
+            print(f"CLASSIFY[{image_url}]: {form_instruction}")
+
+        if form and form_instruction:
+            registry.set_form_template(hash, form)
+            registry.set_form_instruction(hash, form_instruction)
+            print(
+                f"Stored classification for {image_url} (hash: {hash})")
+        else:
+            print(
+                f"Warning: No form or form instruction found for {image_url}, skipping classification")
+
+
+def _migrate_legacy_db(legacy_path, ndjson_path):
+    """One-time migration of the old db.json array into the NDJSON db.
+
+    Earlier versions kept every extracted row in a single JSON array at
+    --db_path; rows now append to the .ndjson sidecar. Fold any legacy
+    array in once and rename the old file *.migrated so reruns skip it.
+    """
+    if not legacy_path.exists():
+        return
+    raw = legacy_path.read_bytes()
+    try:
+        legacy = orjson.loads(raw) if orjson else json.loads(raw)
+    except ValueError:
+        print(f"Warning: could not parse legacy {legacy_path}, leaving it")
+        return
+    if not isinstance(legacy, list):
+        legacy = [legacy]
+    with ndjson_path.open("ab") as f:
+        for row in legacy:
+            line = orjson.dumps(row) if orjson else json.dumps(row).encode()
+            f.write(line + b"\n")
+    legacy_path.rename(legacy_path.with_name(legacy_path.name + ".migrated"))
+    print(f"Migrated {len(legacy)} rows from {legacy_path} to {ndjson_path}")
 
 
 def main():
@@ -71,7 +190,9 @@ def main():
     parser.add_argument("--extract_prompts", nargs="+",
                         default=["./prompts/extract_prompt.txt"], help="Paths to extract_prompt.txt files")
     parser.add_argument("--db_path", default="./db.json",
-                        help="Path to db.json")
+                        help="Path to the extract results db. Rows append "
+                        "to the .ndjson file next to this path; a legacy "
+                        "db.json array at this path is folded in once")
     parser.add_argument("--form_registry_path",
                         default="./form_registry.json", help="Path to form_registry.json")
     parser.add_argument("--identify_prompt", default="./prompts/identify_prompt.txt",
@@ -90,6 +211,9 @@ def main():
                         help="Run classify step")
     parser.add_argument("--extract", action="store_true", default=False,
                         help="Run extract step")
+    parser.add_argument("--extract-batch", action="store_true", default=False,
+                        help="Run the extract step through the OpenAI Batch "
+                        "API (50%% token discount, up-to-24h completion)")
     parser.add_argument("--debug", action="store_true", default=False,
                         help="Enable debug mode to show API costs")
     args = parser.parse_args()
@@ -100,8 +224,14 @@ def main():
     if not api_key:
         raise ValueError(f"OPEN_AI_API_KEY not found in {args.env_path}")
 
-    # Load species names
+    # Load species names; dump the JSON block once up front - every extract
+    # prompt embeds the identical list
     species_names = load_species_names(args.species_dict_path)
+    species_json = json.dumps(species_names, indent=2)
+
+    # Fail fast on colliding filenames, once, instead of re-checking the
+    # same URL list inside every request build
+    ModelClient.validate_urls(args.images)
 
     # Init client and cost calculator
     client = ModelClient(api_key=api_key, model=args.model)
@@ -113,17 +243,85 @@ def main():
     # import pudb
     # pudb.set_trace()
 
+    # Steps 0+1 pipelined: with both flags set, classify chunks fire as
+    # soon as enough identified URLs are ready instead of waiting for the
+    # whole identify fan-out to drain
+    if args.identify and args.classify:
+        identify_prompt = IdentifyPrompt(args.identify_prompt)
+        classify_prompt = ClassifyPrompt(args.classify_prompt)
+
+        triage = registry.triage(args.images)
+        urls_needing_id = triage.needing_id
+        print(f"URLs needing identification: {urls_needing_id}")
+        urls_needing_classification = list(triage.needing_class)
+        identify_responses = {}
+
+        def on_identified(image_url, raw_identify_response):
+            identify_response = IdentifyResponse(raw_identify_response)
+            identify_responses[image_url] = identify_response
+            if args.debug:
+                print(f"IDENTIFY[{image_url}]: {identify_response}")
+
+            # Store URL->hash mapping
+            hash = identify_response.hash()
+            registry.set_hash_for_url(image_url, hash)
+            if registry.has_form_template(hash):
+                return False
+            urls_needing_classification.append(image_url)
+            return True
+
+        classify_responses = [
+            ClassifyResponse(raw)
+            for raw in asyncio.run(_pipeline_identify_classify(
+                client, identify_prompt, classify_prompt, urls_needing_id,
+                triage.needing_class, on_identified))]
+
+        record_classifications(
+            registry, classify_responses, urls_needing_classification,
+            args.debug)
+
+        if args.debug:
+            for image_url, resp in identify_responses.items():
+                cost_calculator.print_cost(
+                    f"IDENTIFY[{image_url}]", resp.usage(), args.model)
+            for chunk_idx, classify_response in enumerate(
+                    classify_responses):
+                cost_calculator.print_cost(
+                    f"CLASSIFY[chunk {chunk_idx}]",
+                    classify_response.usage(), args.model)
+
+        # Compact the registry if its WAL has grown enough; the mutations
+        # above are already durable in the .wal sidecar either way
+        registry.save()
+
     # Step 0: Identify
-    if args.identify:
+    elif args.identify:
         identify_prompt = IdentifyPrompt(args.identify_prompt)
 
         # Get URLs that need identification
-        urls_needing_id = registry.get_urls_needing_identification(args.images)
+        urls_needing_id = registry.triage(args.images).needing_id
         print(f"URLs needing identification: {urls_needing_id}")
 
         identify_responses = {}
-        for image_url in urls_needing_id:
-            raw_identify_response = client.infer(identify_prompt, image_url)
+        raw_identify_responses = []
+        if urls_needing_id:
+            # Each identify call is an independent network round-trip, so fan
+            # them out concurrently: wall time collapses to roughly the
+            # slowest response instead of the sum.
+            async def identify_all():
+                semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+                try:
+                    return await asyncio.gather(
+                        *[client.infer_async(identify_prompt, url, semaphore)
+                          for url in urls_needing_id])
+                finally:
+                    # The aiohttp session is bound to this event loop
+                    await client.aclose()
+
+            raw_identify_responses = asyncio.run(identify_all())
+
+        for image_url, raw_identify_response in zip(
+                urls_needing_id, raw_identify_responses):
             identify_response = IdentifyResponse(raw_identify_response)
             identify_responses[image_url] = identify_response
             if args.debug:
@@ -138,78 +336,80 @@ def main():
                 cost_calculator.print_cost(
                     f"IDENTIFY[{image_url}]", resp.usage(), args.model)
 
-        # Save registry after identification
+        # Compact the registry if its WAL has grown enough
         registry.save()
-    else:
-        print("Skipping identify step")
 
     # Step 1: Classify
     # Typically this step runs for _all_ forms in the study in the first shot,
     # because we're trying to understand the nature of the study in the first
     # place - i.e. is it even a transect study?
-    if args.classify:
+    elif args.classify:
         classify_prompt = ClassifyPrompt(args.classify_prompt)
 
-        # Get URLs that need classification
-        urls_needing_classification = registry.get_urls_needing_classification(
-            args.images)
+        # Get URLs that need classification (re-triaged: identify may have
+        # added hashes since the last pass)
+        urls_needing_classification = registry.triage(
+            args.images).needing_class
 
         if urls_needing_classification:
             print(
                 f"URLs needing classification: {urls_needing_classification}")
 
-            # Run classification in batch mode for _all_ URLs if any of them
-            # need classification.
-            raw_classify_response = client.infer(
-                classify_prompt, args.images)
-            classify_response = ClassifyResponse(raw_classify_response)
-
-            # Map results back to individual URLs using source_file field
-            for image_url in urls_needing_classification:
-                # Get hash for this URL
-                hash = registry.get_hash_for_url(image_url)
-
-                # Get form template and instruction for this specific URL
-                form = classify_response.get_form_by_url(image_url)
-                form_instruction = classify_response.get_form_instruction_by_url(
-                    image_url)
-                if args.debug:
-                    print(f"CLASSIFY[{image_url}]: {form}")
-                    print(f"CLASSIFY[{image_url}]: {form_instruction}")
-
-                if form and form_instruction:
-                    registry.set_form_template(hash, form)
-                    registry.set_form_instruction(hash, form_instruction)
-                    print(
-                        f"Stored classification for {image_url} (hash: {hash})")
-                else:
-                    print(
-                        f"Warning: No form or form instruction found for {image_url}, skipping classification")
+            # Chunk the URLs that actually need classification and fire the
+            # chunks concurrently; already-classified images no longer
+            # re-bill the prompt prefix.
+            chunks = [
+                urls_needing_classification[i:i + CLASSIFY_CHUNK_SIZE]
+                for i in range(0, len(urls_needing_classification),
+                               CLASSIFY_CHUNK_SIZE)]
+
+            async def classify_all():
+                semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+                try:
+                    return await asyncio.gather(
+                        *[client.infer_async(classify_prompt, chunk, semaphore)
+                          for chunk in chunks])
+                finally:
+                    # The aiohttp session is bound to this event loop
+                    await client.aclose()
+
+            classify_responses = [
+                ClassifyResponse(raw)
+                for raw in asyncio.run(classify_all())]
+
+            record_classifications(
+                registry, classify_responses, urls_needing_classification,
+                args.debug)
         else:
             print("No URLs need classification")
 
         if args.debug:
-            # Note: In batch mode, we only have one response to show cost for
             if urls_needing_classification:
-                cost_calculator.print_cost(
-                    f"CLASSIFY[batch]", classify_response.usage(), args.model)
+                for chunk_idx, classify_response in enumerate(
+                        classify_responses):
+                    cost_calculator.print_cost(
+                        f"CLASSIFY[chunk {chunk_idx}]",
+                        classify_response.usage(), args.model)
 
-        # Save registry after classification
+        # Compact the registry if its WAL has grown enough
         registry.save()
-        print(f"Saved form registry to {args.form_registry_path}")
     else:
-        print("Skipping classify step")
+        print("Skipping identify and classify steps")
 
     # Step 2: Extract
     if args.extract:
         # Get form instructions for each URL
-        form_instructions_by_url = registry.get_form_instructions_for_urls(
-            args.images)
+        form_instructions_by_url = registry.triage(
+            args.images).instructions_by_url
         print(
             f"Form instructions by URL: {list(form_instructions_by_url.keys())}")
 
         extract_results = []
         form_results = []
+
+        # Build the (url, prompt) jobs first, then fan the API calls out
+        # concurrently - extraction round-trips are independent of each other
+        extract_jobs = []
         for image_url in args.images:
             form_instruction = form_instructions_by_url.get(image_url)
             if not form_instruction:
@@ -223,7 +423,8 @@ def main():
                 extract_prompt = ExtractPrompt(
                     extract_prompt_path,
                     species_names=species_names,
-                    form_instructions=form_instruction
+                    form_instructions=form_instruction,
+                    species_json=species_json
                 )
 
                 print("=================================================")
@@ -231,8 +432,54 @@ def main():
                     f"EXTRACT[{image_url}][Prompt {prompt_idx + 1}/{len(args.extract_prompts)}]:\n{extract_prompt.user()}")
                 print("=================================================")
 
-                # Run extraction for this single URL with this prompt
-                raw_extract_response = client.infer(extract_prompt, image_url)
+                extract_jobs.append((image_url, extract_prompt))
+
+        if extract_jobs and args.extract_batch:
+            # Batch mode: half-price tokens in exchange for an async
+            # completion window. custom_id maps each result line back to its
+            # image URL for db.json assembly.
+            url_by_custom_id = {}
+            batch_requests = []
+            for i, (image_url, job_prompt) in enumerate(extract_jobs):
+                custom_id = (
+                    f"extract-{i}-"
+                    f"{hashlib.md5(image_url.encode()).hexdigest()[:12]}")
+                url_by_custom_id[custom_id] = image_url
+                batch_requests.append(
+                    (custom_id, client._build_params(job_prompt, image_url)))
+
+            batch_id = submit_batch(client.client, batch_requests)
+            print(
+                f"Submitted extract batch {batch_id} "
+                f"({len(batch_requests)} requests)")
+            batch_results = wait_for_batch(client.client, batch_id)
+
+            for custom_id, raw_extract_response in batch_results.items():
+                image_url = url_by_custom_id.get(custom_id, custom_id)
+                extract_response = ExtractResponse(raw_extract_response)
+                form_results.extend(extract_response.extracted_data())
+                extract_results.append(extract_response)
+
+                if args.debug:
+                    print(f"EXTRACT[{image_url}]: {extract_response}")
+                    cost_calculator.print_cost(
+                        f"EXTRACT[{image_url}]", extract_response.usage(),
+                        args.model)
+        elif extract_jobs:
+            async def extract_all():
+                semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+                try:
+                    return await asyncio.gather(
+                        *[client.infer_async(job_prompt, job_url, semaphore)
+                          for job_url, job_prompt in extract_jobs])
+                finally:
+                    # The aiohttp session is bound to this event loop
+                    await client.aclose()
+
+            raw_extract_responses = asyncio.run(extract_all())
+
+            for (image_url, _), raw_extract_response in zip(
+                    extract_jobs, raw_extract_responses):
                 extract_response = ExtractResponse(raw_extract_response)
                 form_results.extend(extract_response.extracted_data())
                 extract_results.append(extract_response)
@@ -242,17 +489,25 @@ def main():
                     cost_calculator.print_cost(
                         f"EXTRACT[{image_url}]", extract_response.usage(), args.model)
 
-        # Append to db.json
-        db_path = Path(args.db_path)
-        db = []
-        if db_path.exists():
-            db = json.loads(db_path.read_text())
-        db.extend(form_results)
-        db_path.write_text(json.dumps(db, indent=2))
-        print(f"Saved extracted data to {db_path}")
+        # Append the new rows to the NDJSON db: one JSON object per line,
+        # opened in append mode, so writing N new rows no longer re-reads
+        # and re-serializes every row ever extracted
+        db_path = Path(args.db_path).with_suffix(".ndjson")
+        _migrate_legacy_db(Path(args.db_path), db_path)
+        with db_path.open("ab") as f:
+            for row in form_results:
+                line = orjson.dumps(row) if orjson else \
+                    json.dumps(row).encode()
+                f.write(line + b"\n")
+        print(f"Appended {len(form_results)} rows to {db_path}")
     else:
         print("Skipping extract step")
 
+    # Final compaction: fold whatever is left in the WAL into the snapshot
+    # so the registry file itself is current when the run exits
+    registry.save(force=True)
+    print(f"Saved form registry to {args.form_registry_path}")
+
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,18 @@
 import json
+import re
 from pathlib import Path
 
 
 class PlainTextPrompt:
+    # Per-step completion cap, plumbed into the request as max_tokens.
+    # A tight cap bounds worst-case completion billing and stops a
+    # rambling response from running to the model's default limit.
+    MAX_TOKENS = None
+    # Set to {"type": "json_object"} on steps whose response is parsed as
+    # JSON; constrained decoding skips prose preambles the parser would
+    # choke on anyway.
+    RESPONSE_FORMAT = None
+
     def __init__(self, path):
         self.text = Path(path).read_text(encoding="utf-8")
 
@@ -12,14 +22,30 @@ class PlainTextPrompt:
     def user(self):
         return self.text
 
+    def user_parts(self):
+        """User text as a list of content blocks. Subclasses with a large
+        static portion split it from the per-call tail so the byte-identical
+        prefix can hit OpenAI's automatic prompt cache."""
+        return [self.user()]
+
 
 class ClassifyPrompt(PlainTextPrompt):
     """Clarity wrapper for classification step."""
 
+    MAX_TOKENS = 1500
+    RESPONSE_FORMAT = {"type": "json_object"}
+
 
 class IdentifyPrompt(PlainTextPrompt):
     """Clarity wrapper for identification step."""
 
+    # Identify only echoes a handful of printed words, but on reasoning
+    # models the cap also has to cover reasoning tokens - too tight a
+    # budget truncates the JSON and the parse raises instead of degrading
+    MAX_TOKENS = 2000
+    # IdentifyResponse parses the reply as JSON just like classify does
+    RESPONSE_FORMAT = {"type": "json_object"}
+
 
 class ExtractPrompt(PlainTextPrompt):
     """Builds the prompt for the extract step.
@@ -38,17 +64,50 @@ class ExtractPrompt(PlainTextPrompt):
         Prompt string.
     """
 
-    def __init__(self, path, species_names=None, form_instructions=None):
+    MAX_TOKENS = 4000
+    RESPONSE_FORMAT = {"type": "json_object"}
+
+    # The template's two placeholders, compiled once; splitting on this
+    # avoids re-scanning the multi-KB template with str.format per call
+    # (and stops stray braces in JSON examples from breaking formatting)
+    _PLACEHOLDER_RE = re.compile(r"\{(species_names|form_instructions)\}")
+
+    def __init__(self, path, species_names=None, form_instructions=None,
+                 species_json=None):
         super().__init__(path)
         self.species_names = species_names or []
         self.form_instructions = form_instructions or ""
+        # The species list is identical for every form in a run; callers
+        # building one prompt per URL pass the dumped JSON in once instead
+        # of re-serializing it per prompt
+        self.species_json = (
+            species_json if species_json is not None
+            else json.dumps(self.species_names, indent=2))
+        # Precompile the template: split into literal/placeholder parts
+        # (odd indices are captured names) and resolve them now, keeping
+        # the blocks before and after the form_instructions placeholder
+        # separate. The leading block is byte-identical across every
+        # extract call, which is what the provider's prefix cache keys on;
+        # only the trailing block varies per form.
+        stable, dynamic = [], []
+        target = stable
+        for i, part in enumerate(self._PLACEHOLDER_RE.split(self.text)):
+            if i % 2 == 0:
+                target.append(part)
+            elif part == "form_instructions":
+                target = dynamic
+                target.append(self.form_instructions)
+            else:
+                target.append(self.species_json)
+        self._user_parts = (["".join(stable), "".join(dynamic)]
+                            if dynamic else ["".join(stable)])
 
     def user(self):
-        # Fill template fields if present
-        return self.text.format(
-            species_names=json.dumps(self.species_names, indent=2),
-            form_instructions=self.form_instructions,
-        )
+        return "".join(self._user_parts)
+
+    def user_parts(self):
+        """Stable prefix and per-form tail, resolved once in __init__."""
+        return self._user_parts
 
     def build_form_instructions(self, classify_output):
         """
@@ -1,37 +1,130 @@
 import json
+import os
+import tempfile
+from dataclasses import dataclass, field
 from pathlib import Path
+
+try:
+    # ~5-10x faster loads/dumps; the on-disk format is unchanged
+    import orjson
+except ImportError:
+    orjson = None
 from typing import Dict, List, Optional, Any
 
 
+@dataclass
+class TriageResult:
+    """Everything a pipeline phase needs to know about a batch of URLs,
+    computed in one registry pass."""
+    needing_id: List[str] = field(default_factory=list)
+    needing_class: List[str] = field(default_factory=list)
+    instructions_by_url: Dict[str, str] = field(default_factory=dict)
+    templates_by_url: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
 class FormRegistry:
     """
     Manages persistent form registry with URL->hash and hash->template mappings.
     Stores both raw form template data and processed form instruction strings.
+
+    Mutations are appended to a write-ahead log (<registry>.wal) as small
+    JSON lines; the full snapshot is only rewritten when the log passes
+    WAL_COMPACT_THRESHOLD entries (or save(force=True)), so per-step saves
+    stop costing O(registry) I/O.
     """
 
+    # Compact the WAL into the snapshot once it holds this many entries
+    WAL_COMPACT_THRESHOLD = 256
+
     def __init__(self, registry_path: str):
         self.registry_path = Path(registry_path)
+        self.wal_path = self.registry_path.with_suffix(".wal")
+        self._wal = None  # opened lazily on first mutation
+        self._wal_len = 0
         self.data = self._load_registry()
 
     def _load_registry(self) -> Dict[str, Any]:
-        """Load existing registry or create new one."""
+        """Load the snapshot (or an empty registry), then replay the WAL."""
+        data = None
         if self.registry_path.exists():
             try:
-                return json.loads(self.registry_path.read_text())
-            except (json.JSONDecodeError, FileNotFoundError):
+                raw = self.registry_path.read_bytes()
+                data = orjson.loads(raw) if orjson else json.loads(raw)
+            except (ValueError, FileNotFoundError):
                 pass
 
-        # Return empty registry structure
-        return {
-            "url_to_hash": {},
-            "hash_to_form_template": {},
-            "hash_to_form_instruction": {}
-        }
+        if data is None:
+            # Empty registry structure
+            data = {
+                "url_to_hash": {},
+                "hash_to_form_template": {},
+                "hash_to_form_instruction": {}
+            }
+
+        if self.wal_path.exists():
+            with self.wal_path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        op = orjson.loads(line) if orjson else json.loads(line)
+                    except ValueError:
+                        # Truncated tail from an interrupted write
+                        continue
+                    self._apply(data, op)
+                    self._wal_len += 1
+
+        return data
+
+    @staticmethod
+    def _apply(data: Dict[str, Any], op: Dict[str, Any]):
+        """Apply one logged mutation to the in-memory registry."""
+        kind = op.get("op")
+        if kind == "set_hash":
+            data["url_to_hash"][op["url"]] = op["hash"]
+        elif kind == "set_template":
+            data["hash_to_form_template"][op["hash"]] = op["template"]
+        elif kind == "set_instruction":
+            data["hash_to_form_instruction"][op["hash"]] = op["instruction"]
+
+    def _log(self, op: Dict[str, Any]):
+        """Append one mutation to the WAL (line-buffered)."""
+        if self._wal is None:
+            self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+            self._wal = self.wal_path.open("a", buffering=1, encoding="utf-8")
+        line = orjson.dumps(op).decode() if orjson else json.dumps(op)
+        self._wal.write(line + "\n")
+        self._wal_len += 1
+
+    def save(self, force: bool = False):
+        """Compact the WAL into the snapshot when it has grown enough.
+
+        Cheap no-op below the threshold - the WAL already has every
+        mutation durably on disk.
+        """
+        if not force and self._wal_len < self.WAL_COMPACT_THRESHOLD:
+            return
 
-    def save(self):
-        """Write registry back to file."""
         self.registry_path.parent.mkdir(parents=True, exist_ok=True)
-        self.registry_path.write_text(json.dumps(self.data, indent=2))
+        # Atomic snapshot rewrite: write a sibling temp file, then replace
+        fd, tmp_path = tempfile.mkstemp(
+            dir=str(self.registry_path.parent),
+            prefix=self.registry_path.name, suffix=".tmp")
+        if orjson:
+            snapshot = orjson.dumps(
+                self.data, option=orjson.OPT_INDENT_2).decode()
+        else:
+            snapshot = json.dumps(self.data, indent=2)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.registry_path)
+
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+        self.wal_path.unlink(missing_ok=True)
+        self._wal_len = 0
 
     # URL-to-Hash Management
     def get_hash_for_url(self, url: str) -> Optional[str]:
@@ -41,6 +134,7 @@ class FormRegistry:
     def set_hash_for_url(self, url: str, hash: str):
         """Store URL->hash mapping."""
         self.data["url_to_hash"][url] = hash
+        self._log({"op": "set_hash", "url": url, "hash": hash})
 
     # Hash-to-Template Management
     def has_form_template(self, hash: str) -> bool:
@@ -54,6 +148,8 @@ class FormRegistry:
     def set_form_template(self, hash: str, form_template: Dict[str, Any]):
         """Store form template for hash."""
         self.data["hash_to_form_template"][hash] = form_template
+        self._log({"op": "set_template", "hash": hash,
+                   "template": form_template})
 
     # Hash-to-Instruction Management
     def has_form_instruction(self, hash: str) -> bool:
@@ -67,8 +163,36 @@ class FormRegistry:
     def set_form_instruction(self, hash: str, form_instruction: str):
         """Store form instruction for hash."""
         self.data["hash_to_form_instruction"][hash] = form_instruction
+        self._log({"op": "set_instruction", "hash": hash,
+                   "instruction": form_instruction})
 
     # Batch Operations
+    def triage(self, urls: List[str]) -> TriageResult:
+        """Classify a batch of URLs against the registry in a single pass.
+
+        Folds get_urls_needing_identification / get_urls_needing_classification
+        / get_form_instructions_for_urls / get_form_templates_for_urls into
+        one walk over the URL list with the three maps bound to locals.
+        """
+        u2h = self.data["url_to_hash"]
+        templates = self.data["hash_to_form_template"]
+        instructions = self.data["hash_to_form_instruction"]
+        result = TriageResult()
+        for url in urls:
+            hash = u2h.get(url)
+            if not hash:
+                result.needing_id.append(url)
+                continue
+            template = templates.get(hash)
+            if template:
+                result.templates_by_url[url] = template
+            else:
+                result.needing_class.append(url)
+            instruction = instructions.get(hash)
+            if instruction:
+                result.instructions_by_url[url] = instruction
+        return result
+
     def get_urls_needing_identification(self, urls: List[str]) -> List[str]:
         """Return URLs that don't have hashes yet."""
         return [url for url in urls if url not in self.data["url_to_hash"]]